@@ -0,0 +1,220 @@
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from array import array
+
+import degrees
+from graph import CSRGraph
+from landmarks import LandmarkIndex
+
+
+class TimedGraph():
+    """
+    Wraps a graph, timing every call that generates neighbours and
+    adding the totals to stats as "neighbor_calls" and "neighbor_time".
+    """
+
+    def __init__(self, graph, stats):
+        self.graph = graph
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def _timed(self, method, state):
+        start = time.perf_counter()
+        result = list(method(state))
+        self.stats["neighbor_time"] += time.perf_counter() - start
+        self.stats["neighbor_calls"] += 1
+        return result
+
+    def neighbors(self, person):
+        return self._timed(self.graph.neighbors, person)
+
+    def movies_of(self, person):
+        return self._timed(self.graph.movies_of, person)
+
+    def stars_of(self, movie):
+        return self._timed(self.graph.stars_of, movie)
+
+
+def instrumented_path(source, target, engine, graph, memory=False):
+    """
+    Runs degrees.shortest_path over graph and returns (path, stats),
+    where stats holds the search's counters along with its elapsed time,
+    the time spent generating neighbours and, if memory is set, the peak
+    memory allocated while searching.
+    """
+    stats = {"neighbor_calls": 0, "neighbor_time": 0.0}
+    timed = TimedGraph(graph, stats)
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    path = degrees.shortest_path(
+        source, target, engine=engine, graph=timed, stats=stats
+    )
+    stats["elapsed"] = time.perf_counter() - start
+    if memory:
+        stats["memory_peak"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    stats["degrees"] = None if path is None else len(path)
+    return path, stats
+
+
+def synthetic_graph(people=10000, movies=2000, cast=10, seed=0):
+    """
+    Returns a random CSRGraph of people and movies where each movie casts
+    cast people, favouring a few prolific people the way real casts do.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) ** 0.7 for i in range(people)]
+    cumulative = []
+    total = 0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+
+    rows = array("i")
+    cols = array("i")
+    for movie in range(movies):
+        for person in rng.choices(range(people), cum_weights=cumulative,
+                                  k=cast):
+            rows.append(person)
+            cols.append(movie)
+
+    return CSRGraph._from_edges(
+        [str(i) for i in range(people)], [str(i) for i in range(movies)],
+        rows, cols,
+        person_names=[f"Person {i}" for i in range(people)],
+        person_births=[""] * people,
+        movie_titles=[f"Movie {i}" for i in range(movies)],
+        movie_years=[""] * movies,
+    )
+
+
+def sample_queries(graph, count, seed=0):
+    """
+    Returns count random (source, target) pairs of person ids in graph.
+    """
+    rng = random.Random(seed)
+    states = list(graph.person_states())
+    return [(graph.person_id(rng.choice(states)),
+             graph.person_id(rng.choice(states)))
+            for _ in range(count)]
+
+
+def benchmark(graph, queries, engines, memory=False):
+    """
+    Runs every query with every engine.
+
+    Returns a list of per-query records and a list of per-engine
+    summaries, each counting the queries whose degrees of separation
+    disagree with the first engine as "mismatches".
+    """
+    records = []
+    summaries = []
+    expected = None
+    for engine in engines:
+        results = []
+        for source, target in queries:
+            _, stats = instrumented_path(source, target, engine, graph, memory)
+            record = dict(stats, engine=engine, source=source, target=target)
+            records.append(record)
+            results.append(record)
+        degrees_found = [record["degrees"] for record in results]
+        if expected is None:
+            expected = degrees_found
+        summaries.append(summarise(engine, results, expected))
+    return records, summaries
+
+
+def summarise(engine, results, expected):
+    """
+    Returns a summary of one engine's per-query records.
+    """
+    times = sorted(record["elapsed"] for record in results)
+    total = sum(times)
+    neighbor_time = sum(record["neighbor_time"] for record in results)
+    summary = {
+        "type": "summary",
+        "engine": engine,
+        "queries": len(results),
+        "connected": sum(record["degrees"] is not None for record in results),
+        "mismatches": sum(record["degrees"] != degrees_expected
+                          for record, degrees_expected
+                          in zip(results, expected)),
+        "total_time": total,
+        "mean_time": total / len(times) if times else 0,
+        "p50_time": percentile(times, 50),
+        "p95_time": percentile(times, 95),
+        "mean_expanded": (sum(record.get("expanded", 0) for record in results)
+                          / len(results) if results else 0),
+        "frontier_peak": max((record.get("frontier_peak", 0)
+                              for record in results), default=0),
+        "neighbor_time_share": neighbor_time / total if total else 0,
+    }
+    if results and "memory_peak" in results[0]:
+        summary["memory_peak"] = max(record["memory_peak"]
+                                     for record in results)
+    return summary
+
+
+def percentile(values, p):
+    """
+    Returns the pth percentile of a sorted list of values.
+    """
+    if not values:
+        return 0
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the degrees search engines."
+    )
+    parser.add_argument("directory", nargs="?", default="small")
+    parser.add_argument("--synthetic", type=int, metavar="PEOPLE",
+                        help="benchmark a random graph of PEOPLE people")
+    parser.add_argument("--movies", type=int, default=None,
+                        help="number of movies in the random graph")
+    parser.add_argument("--cast", type=int, default=10,
+                        help="cast size of each movie in the random graph")
+    parser.add_argument("--dict", action="store_true",
+                        help="benchmark the dictionaries of load_data")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--engines", default="bfs,bidirectional,movies",
+                        help="comma-separated engines to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true",
+                        help="trace peak memory of each search")
+    parser.add_argument("--per-query", action="store_true",
+                        help="also emit a record for every query")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        graph = synthetic_graph(args.synthetic,
+                                args.movies or args.synthetic // 5,
+                                args.cast, args.seed)
+    elif args.dict:
+        degrees.load_data(args.directory)
+        graph = degrees.graph
+    else:
+        graph = CSRGraph.from_csv(args.directory)
+
+    engines = args.engines.split(",")
+    if "astar" in engines and isinstance(graph, CSRGraph):
+        graph.landmarks = LandmarkIndex.build(graph)
+
+    queries = sample_queries(graph, args.queries, args.seed)
+    records, summaries = benchmark(graph, queries, engines, args.memory)
+    if args.per_query:
+        for record in records:
+            print(json.dumps(record))
+    for summary in summaries:
+        print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
+import argparse
 import csv
+import heapq
+import itertools
+import json
+import multiprocessing
 import sys
+from collections import OrderedDict, deque
 
+from graph import (DictGraph, delta_stamp, load_graph, read_delta,
+                   update_snapshot)
+from landmarks import build_landmarks, load_landmarks
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,6 +21,10 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Graph searched by default: a DictGraph over the dictionaries above,
+# or a compact graph.CSRGraph mapped from a snapshot
+graph = None
+
 
 def load_data(directory):
     """
@@ -19,49 +32,147 @@ def load_data(directory):
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [header.index(key) for key in ("id", "name", "birth")]
         for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
+            person_id, name, birth = (row[column] for column in columns)
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
+            if name.lower() not in names:
+                names[name.lower()] = {person_id}
             else:
-                names[row["name"].lower()].add(row["id"])
+                names[name.lower()].add(person_id)
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [header.index(key) for key in ("id", "title", "year")]
         for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
+            movie_id, title, year = (row[column] for column in columns)
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
                 "stars": set()
             }
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [header.index(key) for key in ("person_id", "movie_id")]
         for row in reader:
+            person_id, movie_id = (row[column] for column in columns)
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
+                people[person_id]["movies"].add(movie_id)
+                movies[movie_id]["stars"].add(person_id)
             except KeyError:
                 pass
 
+    # Label connected components so disconnected pairs need no search,
+    # and index names for prefix and approximate lookups
+    global graph
+    graph = DictGraph(people, movies, names)
+    graph.label_components()
+    graph.name_index()
+
+
+def load_snapshot_data(directory):
+    """
+    Load data from a memory-mapped binary snapshot of the CSV files,
+    building the snapshot first if it is missing or out of date, along
+    with the landmark index if one has been built.
+    """
+    global graph
+    graph = load_graph(directory)
+    load_landmarks(directory, graph)
+
+
+def apply_delta(directory, delta_directory):
+    """
+    Apply the added and removed rows in the delta files of
+    delta_directory to the data loaded from directory, rewriting its
+    snapshot if the data was loaded from one. A snapshot that already
+    has the delta applied is left as it is, and a landmark index attached
+    to it is rebuilt for the updated graph.
+    """
+    global graph
+    changes = read_delta(delta_directory)
+    if isinstance(default_graph(), DictGraph):
+        graph.apply_changes(changes)
+        return
+
+    stamp = delta_stamp(delta_directory)
+    if stamp in graph.deltas:
+        return
+    landmarks = graph.landmarks
+    graph = update_snapshot(graph, directory, changes, delta=stamp)
+    if landmarks is not None:
+        build_landmarks(directory, graph, len(landmarks.landmarks))
+
+
+def load(directory, snapshot=False, delta=None):
+    """
+    Load data from directory, from its snapshot if snapshot is set,
+    then apply the delta files in delta if given.
+    """
+    if snapshot:
+        load_snapshot_data(directory)
+    else:
+        load_data(directory)
+    if delta is not None:
+        apply_delta(directory, delta)
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--engine", choices=ENGINES, default="bfs",
+                        help="search strategy to use")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load data from a memory-mapped snapshot")
+    parser.add_argument("--delta", metavar="DIR",
+                        help="apply the delta files in DIR after loading")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer the pairs in a CSV file as JSON lines")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering a batch")
+    parser.add_argument("--unordered", action="store_true",
+                        help="stream batch results as they are finished")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="resolve misspelt batch names to close matches")
+    args = parser.parse_args()
 
     # Load data from files into memory
+    if args.batch:
+        with open(args.batch, encoding="utf-8") as f:
+            pairs = read_pairs(f)
+        if args.workers > 1:
+            results = parallel_batch_paths(
+                pairs, args.directory, args.snapshot,
+                workers=args.workers, ordered=not args.unordered,
+                fuzzy=args.fuzzy, delta=args.delta
+            )
+        else:
+            load(args.directory, args.snapshot, args.delta)
+            results = batch_paths(pairs, fuzzy=args.fuzzy,
+                                  ordered=not args.unordered)
+        for record in results:
+            print(json.dumps(record), flush=True)
+        return
+
     print("Loading data...")
-    load_data(directory)
+    load(args.directory, args.snapshot, args.delta)
     print("Data loaded.")
 
+    # A* search relies on the landmark index only a snapshot can attach
+    if args.engine == "astar" and getattr(graph, "landmarks", None) is None:
+        sys.exit("astar needs --snapshot and a built landmark index")
+
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
@@ -69,7 +180,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, engine=args.engine)
 
     if path is None:
         print("Not connected.")
@@ -78,17 +189,124 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person(path[i][1])["name"]
+            person2 = graph.person(path[i + 1][1])["name"]
+            movie = graph.movie(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, engine="bfs", graph=None, cache=None,
+                  stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    The engine selects the search strategy: "bfs" for a one-sided
+    breadth-first search, "bidirectional" to grow frontiers from
+    both ends until they meet, "astar" for A* search guided by the
+    graph's landmark index, or "movies" for a breadth-first search that
+    expands each movie's cast only once. The search runs over graph,
+    which defaults to the data loaded by load_data or load_snapshot_data.
+    If a PathCache is given, answers are looked up in and added to it.
+    If a stats dictionary is given, the search adds its counts of people
+    ("expanded") and, for "movies", movies ("movies_expanded") expanded,
+    and the largest frontier it held ("frontier_peak").
+
+    If no possible path, returns None, without searching when the graph's
+    component labels put source and target in different components.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown search engine: {engine}")
+    if cache is not None:
+        found, path = cache.lookup(source, target)
+        if found:
+            return path
+    if graph is None:
+        graph = default_graph()
+
+    start = graph.person_state(source)
+    goal = graph.person_state(target)
+    if graph.connected(start, goal):
+        path = ENGINES[engine](graph, start, goal, stats)
+    else:
+        path = None
+    if path is not None:
+        path = [(graph.movie_id(movie), graph.person_id(person))
+                for movie, person in path]
+    if cache is not None:
+        cache.store(source, target, path)
+    return path
+
+
+class PathCache():
+    """
+    Bounded least-recently-used cache of solved paths, keyed on the
+    unordered pair of people so that a path from A to B also answers
+    a query from B to A.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Maps sorted (person_id, person_id) keys to (source, path)
+        self.paths = OrderedDict()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def lookup(self, source, target):
+        """
+        Returns (True, path) if a path from source to target is cached,
+        reversing a cached path from target to source if needed, and
+        (False, None) otherwise.
+        """
+        key = (min(source, target), max(source, target))
+        if key not in self.paths:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.paths.move_to_end(key)
+        cached_source, path = self.paths[key]
+        if path is None or cached_source == source:
+            return True, None if path is None else list(path)
+        return True, reverse_path(cached_source, path)
+
+    def store(self, source, target, path):
+        """
+        Caches the path (or None) found from source to target, evicting
+        the least recently used entry when full.
+        """
+        key = (min(source, target), max(source, target))
+        self.paths[key] = (source, None if path is None else tuple(path))
+        self.paths.move_to_end(key)
+        if len(self.paths) > self.maxsize:
+            self.paths.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns a dictionary of the cache's hit and miss counters.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self.paths), "maxsize": self.maxsize}
+
+
+def reverse_path(source, path):
+    """
+    Returns the list of (movie_id, person_id) pairs leading back to
+    source along a path that starts at source.
+    """
+    people_on_path = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people_on_path[i])
+            for i in reversed(range(len(path)))]
+
+
+def breadth_first_search(graph, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) state pairs in graph
+    that connect the source to the target, searching breadth-first
+    from the source.
+
     If no possible path, returns None.
     """
 
@@ -109,26 +327,500 @@ def shortest_path(source, target):
         # 2. Remove a node from the frontier
         node = frontier.remove()
 
+        # 3. If node contains goal state, return the solution
+        if node.state == target:
+            solution = []
+            while node.parent is not None:
+                solution.append((node.action, node.state))
+                node = node.parent
+
+            solution.reverse()
+            return solution
+
         # 4. Add the node to the explored set
         explored.add(node.state)
+        if stats is not None:
+            expand(stats, len(frontier.frontier))
 
         # 5. Expand node, add resulting nodes to the frontier
         #    if they aren't already in the frontier or the explored set.
-        for action, state in neighbors_for_person(node.state):
-            if state not in explored:
+        for action, state in graph.neighbors(node.state):
+            if state not in explored and not frontier.contains_state(state):
+                child = Node(state=state, parent=node, action=action)
+                frontier.add(child)
 
-                # 3. If node contains goal state, return the solution
-                if node.state == target:
-                    solution = []
-                    while node.parent is not None:
-                        solution.append((node.action, node.state))
-                        node = node.parent
 
-                    solution.reverse()
-                    return solution
+def bidirectional_search(graph, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) state pairs in graph
+    that connect the source to the target, searching breadth-first
+    from both ends at once and always expanding the smaller frontier.
 
-                child = Node(state=state, parent=node, action=action)
-                frontier.add(child)
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Map each reached person to (parent, movie, depth) on its side
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Grow whichever side currently has the smaller frontier
+        if len(forward_layer) <= len(backward_layer):
+            reached, other, layer = forward, backward, forward_layer
+        else:
+            reached, other, layer = backward, forward, backward_layer
+
+        # Expand the whole layer, keeping the best meeting point found
+        best = None
+        next_layer = []
+        for person in layer:
+            if stats is not None:
+                expand(stats, len(forward_layer) + len(backward_layer))
+            depth = reached[person][2] + 1
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor in reached:
+                    continue
+                reached[neighbor] = (person, movie, depth)
+                next_layer.append(neighbor)
+                if neighbor in other:
+                    length = depth + other[neighbor][2]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor)
+
+        if best is not None:
+            return _join_paths(forward, backward, best[1])
+
+        if reached is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def _join_paths(forward, backward, meeting):
+    """
+    Joins the forward and backward search trees at the meeting person
+    into a list of (movie, person) state pairs from source to target.
+    """
+    solution = []
+    person = meeting
+    while forward[person][0] is not None:
+        parent, movie, _ = forward[person]
+        solution.append((movie, person))
+        person = parent
+    solution.reverse()
+
+    person = meeting
+    while backward[person][0] is not None:
+        parent, movie, _ = backward[person]
+        solution.append((movie, parent))
+        person = parent
+    return solution
+
+
+def landmark_search(graph, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) state pairs in graph
+    that connect the source to the target, using A* search with the
+    landmark lower bounds of graph.landmarks as its heuristic.
+
+    If no possible path, returns None.
+    """
+    index = getattr(graph, "landmarks", None)
+    if index is None:
+        raise ValueError("astar search needs a landmark index")
+
+    # Map each reached person to its (parent, movie) and cost from source
+    parents = {source: (None, None)}
+    costs = {source: 0}
+    counter = itertools.count()
+    frontier = [(index.lower_bound(source, target), next(counter), source)]
+    explored = set()
+
+    while frontier:
+        _, _, person = heapq.heappop(frontier)
+        if person == target:
+            return tree_path(parents, target)
+        if person in explored:
+            continue
+        explored.add(person)
+        if stats is not None:
+            expand(stats, len(frontier))
+
+        cost = costs[person] + 1
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in explored:
+                continue
+            if neighbor not in costs or cost < costs[neighbor]:
+                parents[neighbor] = (person, movie)
+                costs[neighbor] = cost
+                estimate = cost + index.lower_bound(neighbor, target)
+                heapq.heappush(frontier, (estimate, next(counter), neighbor))
+
+    return None
+
+
+def movie_search(graph, source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) state pairs in graph
+    that connect the source to the target, searching breadth-first with
+    movies as intermediate nodes: each movie's cast is expanded only the
+    first time the movie is reached, and people are tested against the
+    goal as soon as they are generated.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    parents = {source: (None, None)}
+    seen_movies = set()
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        if stats is not None:
+            expand(stats, len(queue))
+        for movie in graph.movies_of(person):
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            if stats is not None:
+                count(stats, "movies_expanded")
+            for star in graph.stars_of(movie):
+                if star not in parents:
+                    parents[star] = (person, movie)
+                    if star == target:
+                        return tree_path(parents, target)
+                    queue.append(star)
+    return None
+
+
+def count(stats, key, amount=1):
+    """
+    Adds amount to the counter stored under key in stats.
+    """
+    stats[key] = stats.get(key, 0) + amount
+
+
+def expand(stats, frontier_size):
+    """
+    Records in stats that a person was expanded while frontier_size
+    others were waiting in the frontier.
+    """
+    stats["expanded"] = stats.get("expanded", 0) + 1
+    if frontier_size > stats.get("frontier_peak", 0):
+        stats["frontier_peak"] = frontier_size
+
+
+ENGINES = {
+    "bfs": breadth_first_search,
+    "bidirectional": bidirectional_search,
+    "astar": landmark_search,
+    "movies": movie_search,
+}
+
+
+def search_tree(graph, source, targets):
+    """
+    Grows a breadth-first search tree in graph from the source until
+    every state in targets that shares its component has been reached.
+
+    Returns a dictionary mapping each reached state to a
+    (parent, movie) pair, with (None, None) for the source.
+    """
+    parents = {source: (None, None)}
+    remaining = {target for target in targets
+                 if target != source and graph.connected(source, target)}
+    layer = [source]
+    while layer and remaining:
+        next_layer = []
+        for person in layer:
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor not in parents:
+                    parents[neighbor] = (person, movie)
+                    remaining.discard(neighbor)
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return parents
+
+
+def tree_path(parents, target):
+    """
+    Returns the list of (movie, person) state pairs leading from the
+    root of a search tree to target, or None if target was not reached.
+    """
+    if target not in parents:
+        return None
+    solution = []
+    while parents[target][0] is not None:
+        parent, movie = parents[target]
+        solution.append((movie, target))
+        target = parent
+    solution.reverse()
+    return solution
+
+
+def all_shortest_paths(source, target, graph=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, one at a time, walking the
+    layered graph of shortest paths back from the target so that no
+    more than one path is held in memory.
+    """
+    if graph is None:
+        graph = default_graph()
+    start = graph.person_state(source)
+    goal = graph.person_state(target)
+    layers = shortest_path_layers(graph, start, goal)
+    if layers is None:
+        return
+
+    if start == goal:
+        yield []
+        return
+
+    # Walk back from the goal along one shared path of (movie, person)
+    # steps, keeping an iterator over the untried parents of each person
+    path = []
+    people = [goal]
+    branches = [iter(layers[goal])]
+    while branches:
+        step = next(branches[-1], None)
+        if step is None:
+            # Every parent tried: step back towards the goal
+            branches.pop()
+            people.pop()
+            if path:
+                path.pop()
+            continue
+        movie, parent = step
+        path.append((movie, people[-1]))
+        if parent == start:
+            yield [(graph.movie_id(movie), graph.person_id(person))
+                   for movie, person in reversed(path)]
+            path.pop()
+            continue
+        people.append(parent)
+        branches.append(iter(layers[parent]))
+
+
+def k_shortest_paths(source, target, k, graph=None):
+    """
+    Returns a list of at most k of the shortest lists of
+    (movie_id, person_id) pairs connecting the source to the target.
+    """
+    return list(itertools.islice(all_shortest_paths(source, target, graph), k))
+
+
+def count_shortest_paths(source, target, graph=None):
+    """
+    Returns the number of distinct shortest lists of (movie_id, person_id)
+    pairs connecting the source to the target, counted layer by layer
+    without enumerating them.
+    """
+    if graph is None:
+        graph = default_graph()
+    start = graph.person_state(source)
+    goal = graph.person_state(target)
+    layers = shortest_path_layers(graph, start, goal)
+    if layers is None:
+        return 0
+
+    # Dictionaries preserve insertion order, which is breadth-first order,
+    # so every person's parents are counted before the person
+    counts = {start: 1}
+    for person, edges in layers.items():
+        if person != start:
+            counts[person] = sum(counts[parent] for _, parent in edges)
+    return counts[goal]
+
+
+def shortest_path_layers(graph, source, target):
+    """
+    Searches graph breadth-first from the source until the layer holding
+    the target is complete.
+
+    Returns a dictionary mapping every person reached up to the target's
+    depth, in breadth-first order, to the list of (movie, parent) edges
+    that reach them from the previous layer, or None if the target
+    cannot be reached.
+    """
+    if not graph.connected(source, target):
+        return None
+    layers = {source: []}
+    layer = [source]
+    while layer and target not in layers:
+        next_layer = {}
+        for person in layer:
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor in layers:
+                    continue
+                if neighbor not in next_layer:
+                    next_layer[neighbor] = []
+                next_layer[neighbor].append((movie, person))
+        layers.update(next_layer)
+        layer = list(next_layer)
+    if target not in layers:
+        return None
+    return layers
+
+
+def batch_paths(pairs, graph=None, fuzzy=False, ordered=True):
+    """
+    Answers many (source, target) pairs of names or IMDB ids, growing
+    one search tree per distinct source to answer all of its targets.
+
+    Yields one result dictionary per pair, carrying the pair's position
+    in pairs as "index". If ordered, yields results in the order of
+    pairs; otherwise yields them as soon as each source is finished.
+    If fuzzy is set, misspelt names resolve to the closest unambiguous
+    match.
+    """
+    if graph is None:
+        graph = default_graph()
+    errors, groups = group_pairs(pairs, graph, fuzzy)
+    results = itertools.chain(errors, itertools.chain.from_iterable(
+        answer_group(graph, source_id, group)
+        for source_id, group in groups.items()
+    ))
+    if ordered:
+        results = in_order(results)
+    yield from results
+
+
+def in_order(results):
+    """
+    Yields result dictionaries in the order of their "index", holding
+    back each one until every earlier result has been yielded.
+    """
+    pending = {}
+    index = 0
+    for record in results:
+        pending[record["index"]] = record
+        while index in pending:
+            yield pending.pop(index)
+            index += 1
+
+
+def parallel_batch_paths(pairs, directory, snapshot=True, workers=None,
+                         ordered=True, fuzzy=False, delta=None):
+    """
+    Answers many (source, target) pairs like batch_paths, fanning the
+    per-source groups out over a pool of worker processes that each
+    load the data in directory once, sharing its pages when loaded from
+    a snapshot, and apply the delta files in delta if given. Uses
+    os.cpu_count() workers unless workers is given.
+
+    If ordered, yields results in the order of pairs; otherwise yields
+    them as soon as each group is finished.
+    """
+    if graph is None:
+        load(directory, snapshot, delta)
+    errors, groups = group_pairs(pairs, default_graph(), fuzzy)
+
+    # A delta applied to a snapshot has already been written back to it
+    if snapshot:
+        delta = None
+    with multiprocessing.Pool(workers, initializer=load_worker,
+                              initargs=(directory, snapshot, delta)) as pool:
+        answered = pool.imap_unordered(_answer_group_task, groups.items())
+        results = itertools.chain(
+            errors, itertools.chain.from_iterable(answered)
+        )
+        if ordered:
+            results = in_order(results)
+        yield from results
+
+
+def load_worker(directory, snapshot, delta=None):
+    """
+    Loads the data in a worker process unless it was inherited from
+    the parent process.
+    """
+    if graph is None:
+        load(directory, snapshot, delta)
+
+
+def _answer_group_task(item):
+    source_id, group = item
+    return answer_group(default_graph(), source_id, group)
+
+
+def group_pairs(pairs, graph, fuzzy=False):
+    """
+    Resolves (source, target) pairs of names or IMDB ids in graph.
+
+    Returns a list of result dictionaries for pairs that could not be
+    resolved, and a dictionary mapping each source id to a list of
+    (result, target_id) pairs to be answered from it.
+    """
+    errors = []
+    groups = {}
+    for index, (source, target) in enumerate(pairs):
+        record = {"index": index, "source": source, "target": target}
+        source_id, error = resolve_person(source, graph, fuzzy)
+        if error is None:
+            target_id, error = resolve_person(target, graph, fuzzy)
+        if error is not None:
+            record["error"] = error
+            errors.append(record)
+            continue
+        groups.setdefault(source_id, []).append((record, target_id))
+    return errors, groups
+
+
+def answer_group(graph, source_id, group):
+    """
+    Fills in the results for a group of (result, target_id) pairs from
+    group_pairs using one search tree grown from source_id.
+
+    Returns the list of results.
+    """
+    parents = search_tree(
+        graph,
+        graph.person_state(source_id),
+        [graph.person_state(target_id) for _, target_id in group],
+    )
+    results = []
+    for record, target_id in group:
+        path = tree_path(parents, graph.person_state(target_id))
+        if path is None:
+            record["degrees"] = None
+            record["path"] = None
+        else:
+            record["degrees"] = len(path)
+            record["path"] = [
+                [graph.movie_id(movie), graph.person_id(person)]
+                for movie, person in path
+            ]
+        results.append(record)
+    return results
+
+
+def read_pairs(f):
+    """
+    Returns the (source, target) pairs of names or IMDB ids in a CSV
+    file with one pair per line, skipping blank lines.
+    """
+    return [(row[0].strip(), row[1].strip())
+            for row in csv.reader(f) if row]
+
+
+def default_graph():
+    """
+    Returns the loaded graph, or a view over the people and movies
+    dictionaries if they were filled in some other way.
+    """
+    global graph
+    if graph is None:
+        graph = DictGraph(people, movies, names)
+    return graph
 
 
 def person_id_for_name(name):
@@ -136,13 +828,13 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = default_graph().person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = default_graph().person(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -157,6 +849,44 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_candidates(name, limit=10, max_distance=2):
+    """
+    Returns up to limit people whose names match name exactly, start
+    with it, or are within max_distance edits of it, best first, as
+    dictionaries of: person_id, name, birth, distance.
+    """
+    graph = default_graph()
+    candidates = graph.name_index().search(name, limit, max_distance)
+    for candidate in candidates:
+        candidate["birth"] = graph.person(candidate["person_id"])["birth"]
+    return candidates
+
+
+def resolve_person(value, graph, fuzzy=False):
+    """
+    Returns (person_id, error) for a value that is either an IMDB id or
+    a name matching exactly one person, without prompting.
+
+    If fuzzy is set, a name matching nobody exactly resolves to the one
+    person whose name is strictly closest to it, if any is close enough.
+    """
+    if graph.person_state(value) is not None:
+        return value, None
+    person_ids = graph.person_ids_for_name(value)
+    if len(person_ids) == 0 and fuzzy:
+        candidates = graph.name_index().closest(value, limit=2)
+        if len(candidates) == 1 or (
+            len(candidates) == 2
+            and candidates[0]["distance"] < candidates[1]["distance"]
+        ):
+            return candidates[0]["person_id"], None
+    if len(person_ids) == 0:
+        return None, f"Person not found: {value}"
+    elif len(person_ids) > 1:
+        return None, f"Ambiguous name: {value}"
+    return person_ids[0], None
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -0,0 +1,858 @@
+import csv
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+from nameindex import NameIndex
+
+# Identifies snapshot files written by write_snapshot
+SNAPSHOT_MAGIC = b"DEGSNAP3"
+
+# Source files whose size and modification time key a snapshot
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Maps each kind of change to its delta file and the columns read when
+# adding and when removing a row
+CHANGES = {
+    "person": ("people.csv", ("id", "name", "birth"), ("id",)),
+    "movie": ("movies.csv", ("id", "title", "year"), ("id",)),
+    "star": ("stars.csv", ("person_id", "movie_id"),
+             ("person_id", "movie_id")),
+}
+
+
+class DictGraph():
+    """
+    Search view over the people and movies dictionaries built by
+    degrees.load_data, where states are the IMDB ids themselves.
+    """
+
+    def __init__(self, people, movies, names):
+        self.people = people
+        self.movies = movies
+        self.names = names
+        # Union-find forest mapping each person_id to a parent person_id
+        # in its connected component, built on first use
+        self.components = None
+        self.names_index = None
+
+    def person_state(self, person_id):
+        return person_id if person_id in self.people else None
+
+    def person_states(self):
+        return iter(self.people)
+
+    def person_id(self, state):
+        return state
+
+    def movie_id(self, state):
+        return state
+
+    def person(self, person_id):
+        return self.people[person_id]
+
+    def movie(self, movie_id):
+        return self.movies[movie_id]
+
+    def person_ids_for_name(self, name):
+        return sorted(self.names.get(name.lower(), set()))
+
+    def name_index(self):
+        """
+        Returns the NameIndex over people's names, building it on first use.
+        """
+        if self.names_index is None:
+            person_ids = list(self.people)
+            person_names = [self.people[i]["name"] for i in person_ids]
+            order = sorted(range(len(person_ids)),
+                           key=lambda i: person_names[i].lower())
+            self.names_index = NameIndex(person_names, person_ids, order)
+        return self.names_index
+
+    def label_components(self):
+        """
+        Groups every person into its connected component.
+        """
+        self.components = {person_id: person_id for person_id in self.people}
+        for movie in self.movies.values():
+            first = None
+            for star in movie["stars"]:
+                if first is None:
+                    first = star
+                else:
+                    self.join(first, star)
+
+    def component(self, person):
+        """
+        Returns the representative person of the component of person.
+        """
+        if self.components is None:
+            self.label_components()
+        parent = self.components
+        while parent[person] != person:
+            parent[person] = parent[parent[person]]
+            person = parent[person]
+        return person
+
+    def connected(self, u, v):
+        return self.component(u) == self.component(v)
+
+    def join(self, u, v):
+        """
+        Merges the components of people u and v after they are linked.
+        """
+        if self.components is not None:
+            self.components[self.component(u)] = self.component(v)
+
+    def add_person(self, person_id, name, birth):
+        if person_id in self.people:
+            self._unname(person_id)
+            self.people[person_id]["name"] = name
+            self.people[person_id]["birth"] = birth
+        else:
+            self.people[person_id] = {
+                "name": name, "birth": birth, "movies": set()
+            }
+            if self.components is not None:
+                self.components[person_id] = person_id
+        self.names.setdefault(name.lower(), set()).add(person_id)
+        self.names_index = None
+
+    def remove_person(self, person_id):
+        if person_id not in self.people:
+            return
+        self._unname(person_id)
+        for movie_id in self.people.pop(person_id)["movies"]:
+            self.movies[movie_id]["stars"].discard(person_id)
+        self.components = None
+        self.names_index = None
+
+    def _unname(self, person_id):
+        name = self.people[person_id]["name"].lower()
+        self.names[name].discard(person_id)
+        if not self.names[name]:
+            del self.names[name]
+
+    def add_movie(self, movie_id, title, year):
+        if movie_id in self.movies:
+            self.movies[movie_id]["title"] = title
+            self.movies[movie_id]["year"] = year
+        else:
+            self.movies[movie_id] = {
+                "title": title, "year": year, "stars": set()
+            }
+
+    def remove_movie(self, movie_id):
+        if movie_id not in self.movies:
+            return
+        stars = self.movies.pop(movie_id)["stars"]
+        for person_id in stars:
+            self.people[person_id]["movies"].discard(movie_id)
+        if stars:
+            self.components = None
+
+    def add_star(self, person_id, movie_id):
+        if person_id not in self.people or movie_id not in self.movies:
+            return
+        stars = self.movies[movie_id]["stars"]
+        if stars:
+            self.join(person_id, next(iter(stars)))
+        stars.add(person_id)
+        self.people[person_id]["movies"].add(movie_id)
+
+    def remove_star(self, person_id, movie_id):
+        if person_id not in self.people or movie_id not in self.movies:
+            return
+        if person_id in self.movies[movie_id]["stars"]:
+            self.movies[movie_id]["stars"].discard(person_id)
+            self.people[person_id]["movies"].discard(movie_id)
+            self.components = None
+
+    def apply_changes(self, changes):
+        """
+        Applies (op, kind, fields) changes from read_delta in place,
+        keeping the component forest up to date as links are added and
+        relabelling it on next use after anything is removed.
+        """
+        for op, kind, fields in changes:
+            getattr(self, f"{op}_{kind}")(*fields)
+
+    def movies_of(self, person):
+        return self.people[person]["movies"]
+
+    def stars_of(self, movie):
+        return self.movies[movie]["stars"]
+
+    def neighbors(self, person):
+        neighbors = set()
+        for movie in self.people[person]["movies"]:
+            for star in self.movies[movie]["stars"]:
+                neighbors.add((movie, star))
+        return neighbors
+
+
+class CSRGraph():
+    """
+    Compact people/movies graph. IMDB ids are interned to dense integers
+    and the person->movie and movie->person adjacency are stored as
+    compressed sparse rows: an offsets buffer and an indices buffer,
+    so the movies of person i are indices[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people,
+                 person_names=None, person_births=None,
+                 movie_titles=None, movie_years=None,
+                 person_index=None, movie_index=None, name_order=None,
+                 components=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: i for i, movie_id in enumerate(movie_ids)
+            }
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.name_order = name_order
+        self.names_index = None
+        if components is None:
+            components = label_components(len(person_ids), (
+                self.stars_of(movie) for movie in range(len(movie_ids))
+            ))
+        # Component id of each person
+        self.components = components
+        # Optional landmarks.LandmarkIndex used by A* search
+        self.landmarks = None
+        # Number of deltas applied since the graph was built from CSV
+        self.revision = 0
+        # Stamps of the delta directories written into the graph's snapshot
+        self.deltas = []
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Builds a compact graph from the dictionaries of degrees.load_data.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        rows = array("i")
+        cols = array("i")
+        for i, person_id in enumerate(person_ids):
+            for movie_id in people[person_id]["movies"]:
+                rows.append(i)
+                cols.append(movie_index[movie_id])
+        return cls._from_edges(
+            person_ids, movie_ids, rows, cols,
+            person_names=[people[i]["name"] for i in person_ids],
+            person_births=[people[i]["birth"] for i in person_ids],
+            movie_titles=[movies[i]["title"] for i in movie_ids],
+            movie_years=[movies[i]["year"] for i in movie_ids],
+        )
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a compact graph straight from the CSV files in directory,
+        without materialising per-person or per-movie sets.
+        """
+        person_ids = []
+        person_names = []
+        person_births = []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = [header.index(key) for key in ("id", "name", "birth")]
+            for row in reader:
+                person_id, name, birth = (row[column] for column in columns)
+                person_index[person_id] = len(person_ids)
+                person_ids.append(person_id)
+                person_names.append(name)
+                person_births.append(birth)
+
+        movie_ids = []
+        movie_titles = []
+        movie_years = []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = [header.index(key) for key in ("id", "title", "year")]
+            for row in reader:
+                movie_id, title, year = (row[column] for column in columns)
+                movie_index[movie_id] = len(movie_ids)
+                movie_ids.append(movie_id)
+                movie_titles.append(title)
+                movie_years.append(year)
+
+        rows = array("i")
+        cols = array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            person_column = header.index("person_id")
+            movie_column = header.index("movie_id")
+            for row in reader:
+                person = person_index.get(row[person_column])
+                movie = movie_index.get(row[movie_column])
+                if person is not None and movie is not None:
+                    rows.append(person)
+                    cols.append(movie)
+
+        return cls._from_edges(
+            person_ids, movie_ids, rows, cols,
+            person_names=person_names, person_births=person_births,
+            movie_titles=movie_titles, movie_years=movie_years,
+            person_index=person_index, movie_index=movie_index,
+        )
+
+    @classmethod
+    def _from_edges(cls, person_ids, movie_ids, rows, cols, **tables):
+        person_offsets, person_movies = build_csr(rows, cols, len(person_ids))
+        movie_offsets, movie_people = build_csr(cols, rows, len(movie_ids))
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies,
+                   movie_offsets, movie_people, **tables)
+
+    def apply_changes(self, changes):
+        """
+        Returns a new CSRGraph with the (op, kind, fields) changes from
+        read_delta applied. The buffers are rebuilt from this graph's
+        arrays and string tables, without re-reading any CSV file.
+        """
+        people = {
+            person_id: (self.person_names[i], self.person_births[i])
+            for i, person_id in enumerate(self.person_ids)
+        }
+        movies = {
+            movie_id: (self.movie_titles[i], self.movie_years[i])
+            for i, movie_id in enumerate(self.movie_ids)
+        }
+
+        # Existing links to drop, by old index, and new links by id
+        dropped_people = set()
+        dropped_movies = set()
+        dropped_stars = set()
+        added_stars = {}
+        for op, kind, fields in changes:
+            if kind == "person":
+                if op == "add":
+                    people[fields[0]] = fields[1:]
+                elif people.pop(fields[0], None) is not None:
+                    dropped_people.add(self.person_index.get(fields[0]))
+            elif kind == "movie":
+                if op == "add":
+                    movies[fields[0]] = fields[1:]
+                elif movies.pop(fields[0], None) is not None:
+                    dropped_movies.add(self.movie_index.get(fields[0]))
+            elif op == "add":
+                added_stars[fields] = True
+            else:
+                added_stars.pop(fields, None)
+                dropped_stars.add((self.person_index.get(fields[0]),
+                                   self.movie_index.get(fields[1])))
+
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        # Carry over the surviving links, then add the new ones
+        rows = array("i")
+        cols = array("i")
+        for old_person, person_id in enumerate(self.person_ids):
+            if old_person in dropped_people or person_id not in people:
+                continue
+            for old_movie in self.movies_of(old_person):
+                if (old_movie in dropped_movies
+                        or (old_person, old_movie) in dropped_stars):
+                    continue
+                rows.append(person_index[person_id])
+                cols.append(movie_index[self.movie_ids[old_movie]])
+        for person_id, movie_id in added_stars:
+            if person_id in person_index and movie_id in movie_index:
+                rows.append(person_index[person_id])
+                cols.append(movie_index[movie_id])
+
+        graph = self._from_edges(
+            person_ids, movie_ids, rows, cols,
+            person_names=[people[i][0] for i in person_ids],
+            person_births=[people[i][1] for i in person_ids],
+            movie_titles=[movies[i][0] for i in movie_ids],
+            movie_years=[movies[i][1] for i in movie_ids],
+            person_index=person_index, movie_index=movie_index,
+        )
+        graph.revision = self.revision + 1
+        return graph
+
+    def person_state(self, person_id):
+        return self.person_index.get(person_id)
+
+    def person_id(self, state):
+        return self.person_ids[state]
+
+    def movie_id(self, state):
+        return self.movie_ids[state]
+
+    def person(self, person_id):
+        i = self.person_index[person_id]
+        return {"name": self.person_names[i], "birth": self.person_births[i]}
+
+    def movie(self, movie_id):
+        i = self.movie_index[movie_id]
+        return {"title": self.movie_titles[i], "year": self.movie_years[i]}
+
+    def person_ids_for_name(self, name):
+        return sorted(candidate["person_id"]
+                      for candidate in self.name_index().exact(name))
+
+    def name_index(self):
+        """
+        Returns the NameIndex over people's names, building it on first use.
+        """
+        if self.names_index is None:
+            if self.name_order is None:
+                self.name_order = array("i", sorted(
+                    range(len(self.person_ids)), key=self._lower_name
+                ))
+            self.names_index = NameIndex(
+                self.person_names, self.person_ids, self.name_order
+            )
+        return self.names_index
+
+    def _lower_name(self, i):
+        return self.person_names[i].lower()
+
+    def person_states(self):
+        return iter(range(len(self.person_ids)))
+
+    def component(self, person):
+        return self.components[person]
+
+    def connected(self, u, v):
+        return self.components[u] == self.components[v]
+
+    def movies_of(self, person):
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_of(self, movie):
+        offsets = self.movie_offsets
+        return self.movie_people[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person):
+        person_offsets = self.person_offsets
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = self.person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+
+def build_csr(rows, cols, n):
+    """
+    Returns (offsets, indices) arrays for the n-row sparse matrix with
+    an entry at each (rows[k], cols[k]), with duplicate entries removed
+    and each row's indices sorted.
+    """
+    # Count entries per row and turn the counts into row offsets
+    counts = array("i", bytes(4 * (n + 1)))
+    for row in rows:
+        counts[row + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+
+    # Scatter each column into its row's slot
+    indices = array("i", bytes(4 * len(cols)))
+    cursor = counts[:-1]
+    for row, col in zip(rows, cols):
+        indices[cursor[row]] = col
+        cursor[row] += 1
+
+    # Sort each row and drop duplicate entries
+    offsets = array("i", [0])
+    unique = array("i")
+    for i in range(n):
+        previous = None
+        for col in sorted(indices[counts[i]:counts[i + 1]]):
+            if col != previous:
+                unique.append(col)
+                previous = col
+        offsets.append(len(unique))
+    return offsets, unique
+
+
+def label_components(n, groups):
+    """
+    Returns an array labelling each of the people 0 to n - 1 with a
+    dense component id, where the people in each of groups (the cast of
+    a movie) are connected, using union-find with path halving.
+    """
+    parent = array("i", range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for group in groups:
+        first = None
+        for member in group:
+            root = find(member)
+            if first is None:
+                first = root
+            elif root != first:
+                parent[root] = first
+
+    labels = array("i", [-1]) * n
+    count = 0
+    for x in range(n):
+        root = find(x)
+        if labels[root] == -1:
+            labels[root] = count
+            count += 1
+        labels[x] = labels[root]
+    return labels
+
+
+def component_stats(graph):
+    """
+    Returns a dictionary describing the connected components of graph:
+    how many there are, the size of the largest, how many hold a single
+    person, and how many components there are of each size.
+    """
+    sizes = {}
+    for person in graph.person_states():
+        label = graph.component(person)
+        sizes[label] = sizes.get(label, 0) + 1
+    histogram = {}
+    for size in sizes.values():
+        histogram[size] = histogram.get(size, 0) + 1
+    return {
+        "components": len(sizes),
+        "largest": max(sizes.values(), default=0),
+        "singletons": histogram.get(1, 0),
+        "sizes": dict(sorted(histogram.items())),
+    }
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored back to back as UTF-8 in blob,
+    with string i occupying blob[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    @classmethod
+    def encode(cls, strings):
+        """
+        Returns (blob, offsets) encoding a sequence of strings.
+        """
+        blob = bytearray()
+        offsets = array("i", [0])
+        for string in strings:
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+        return bytes(blob), offsets
+
+
+class SortedIndex():
+    """
+    Maps keys to positions in a sequence using a permutation of the
+    positions sorted by key, so lookups need no hash table.
+    """
+
+    def __init__(self, keys, order):
+        self.keys = keys
+        self.order = order
+
+    def __getitem__(self, key):
+        i = self.get(key)
+        if i is None:
+            raise KeyError(key)
+        return i
+
+    def get(self, key, default=None):
+        i = bisect_left(self.order, key, key=self.keys.__getitem__)
+        if i < len(self.order) and self.keys[self.order[i]] == key:
+            return self.order[i]
+        return default
+
+
+def source_stamp(directory):
+    """
+    Returns the size and modification time of each source CSV file,
+    used to tell whether a snapshot is still fresh.
+    """
+    stamp = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamp[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamp
+
+
+def write_snapshot(graph, path, stamp):
+    """
+    Writes graph to a binary snapshot file at path, tagged with the
+    source stamp it was built from.
+    """
+    sections = {
+        "person_offsets": graph.person_offsets,
+        "person_movies": graph.person_movies,
+        "movie_offsets": graph.movie_offsets,
+        "movie_people": graph.movie_people,
+        "person_order": array("i", sorted(
+            range(len(graph.person_ids)), key=graph.person_ids.__getitem__
+        )),
+        "movie_order": array("i", sorted(
+            range(len(graph.movie_ids)), key=graph.movie_ids.__getitem__
+        )),
+        "name_order": array("i", sorted(
+            range(len(graph.person_ids)), key=graph._lower_name
+        )),
+        "components": graph.components,
+    }
+    for table in ("person_ids", "movie_ids", "person_names",
+                  "person_births", "movie_titles", "movie_years"):
+        blob, offsets = StringTable.encode(getattr(graph, table))
+        sections[f"{table}.blob"] = blob
+        sections[f"{table}.offsets"] = offsets
+
+    header = {"stamp": stamp, "revision": graph.revision,
+              "deltas": graph.deltas}
+    write_sections(path, SNAPSHOT_MAGIC, header, sections)
+
+
+# Sections every snapshot written by write_snapshot holds
+SNAPSHOT_SECTIONS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_people",
+    "person_order", "movie_order", "name_order", "components",
+) + tuple(f"{table}.{part}"
+          for table in ("person_ids", "movie_ids", "person_names",
+                        "person_births", "movie_titles", "movie_years")
+          for part in ("blob", "offsets"))
+
+
+def load_snapshot(path, stamp=None):
+    """
+    Memory-maps the snapshot at path and returns a CSRGraph whose buffers
+    are views into the mapped file, so processes loading the same
+    snapshot share its pages.
+
+    If the snapshot is missing, unreadable or was built from a different
+    source stamp, returns None.
+    """
+    mapping = map_sections(path, SNAPSHOT_MAGIC)
+    if mapping is None:
+        return None
+    header, sections, mapped = mapping
+    if any(key not in header for key in ("stamp", "revision")):
+        return None
+    if any(name not in sections for name in SNAPSHOT_SECTIONS):
+        return None
+    if stamp is not None and header["stamp"] != stamp:
+        return None
+
+    tables = {}
+    for table in ("person_ids", "movie_ids", "person_names",
+                  "person_births", "movie_titles", "movie_years"):
+        tables[table] = StringTable(
+            sections[f"{table}.blob"], sections[f"{table}.offsets"]
+        )
+
+    graph = CSRGraph(
+        tables["person_ids"], tables["movie_ids"],
+        sections["person_offsets"], sections["person_movies"],
+        sections["movie_offsets"], sections["movie_people"],
+        person_names=tables["person_names"],
+        person_births=tables["person_births"],
+        movie_titles=tables["movie_titles"],
+        movie_years=tables["movie_years"],
+        person_index=SortedIndex(
+            tables["person_ids"], sections["person_order"]
+        ),
+        movie_index=SortedIndex(
+            tables["movie_ids"], sections["movie_order"]
+        ),
+        name_order=sections["name_order"],
+        components=sections["components"],
+    )
+    graph.revision = header["revision"]
+    graph.deltas = header.get("deltas", [])
+    graph.mapped = mapped
+    return graph
+
+
+def write_sections(path, magic, header, sections):
+    """
+    Writes a binary file at path holding magic, a JSON header and the
+    named sections (arrays or bytes) back to back, each aligned to
+    8 bytes so they can be cast in place once memory-mapped.
+    """
+    layout = {}
+    position = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        size = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        layout[name] = [position, size, typecode]
+        position += -(-size // 8) * 8
+    header = json.dumps(dict(
+        header, byteorder=sys.byteorder, sections=layout
+    )).encode("utf-8")
+
+    # Write to a temporary file and swap it in so readers never see
+    # a partially written file
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(magic)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(bytes(-f.tell() % 8))
+        for name, data in sections.items():
+            f.write(data)
+            f.write(bytes(-layout[name][1] % 8))
+    os.replace(temporary, path)
+
+
+def map_sections(path, magic):
+    """
+    Memory-maps a file written by write_sections.
+
+    Returns (header, sections, mapped), where sections maps each name
+    to a memoryview into the mapping, or None if the file is missing,
+    unreadable, truncated, of a different kind or written on a machine
+    of different byte order.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(mapped)
+    if bytes(view[:len(magic)]) != magic:
+        return None
+    start = len(magic) + 8
+    length = int.from_bytes(view[len(magic):start], "little")
+
+    # A damaged header or section table means the file must be rebuilt
+    try:
+        header = json.loads(str(view[start:start + length], "utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            return None
+
+        base = start + length + (-(start + length) % 8)
+        sections = {}
+        for name, (position, size, typecode) in header["sections"].items():
+            begin = base + position
+            if begin + size > len(view):
+                return None
+            sections[name] = view[begin:begin + size].cast(typecode)
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+        return None
+    return header, sections, mapped
+
+
+def load_graph(directory, path=None):
+    """
+    Returns a CSRGraph for the CSV files in directory, memory-mapped from
+    a snapshot at path (default: directory/degrees.snapshot) when one
+    matches the files' current size and modification time, and otherwise
+    built from the CSV files and written to path for next time.
+    """
+    if path is None:
+        path = os.path.join(directory, "degrees.snapshot")
+    stamp = source_stamp(directory)
+    graph = load_snapshot(path, stamp)
+    if graph is None:
+        write_snapshot(CSRGraph.from_csv(directory), path, stamp)
+        graph = load_snapshot(path, stamp)
+    return graph
+
+
+def update_snapshot(graph, directory, changes, path=None, delta=None):
+    """
+    Applies (op, kind, fields) changes to a CSRGraph loaded for the CSV
+    files in directory, rewrites its snapshot at path (default:
+    directory/degrees.snapshot) and returns the newly mapped graph.
+
+    If the changes come from a delta directory, delta is its
+    delta_stamp, recorded in the snapshot so it is not applied twice.
+    """
+    if path is None:
+        path = os.path.join(directory, "degrees.snapshot")
+    stamp = source_stamp(directory)
+    updated = graph.apply_changes(changes)
+    updated.deltas = graph.deltas + ([delta] if delta is not None else [])
+    write_snapshot(updated, path, stamp)
+    return load_snapshot(path, stamp)
+
+
+def delta_stamp(directory):
+    """
+    Returns the location, size and modification time of the delta
+    files in directory, used to tell whether a snapshot already has
+    them applied.
+    """
+    files = {}
+    for filename, _, _ in CHANGES.values():
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            files[filename] = [stat.st_size, stat.st_mtime_ns]
+    return {"directory": os.path.abspath(directory), "files": files}
+
+
+def read_delta(directory):
+    """
+    Yields (op, kind, fields) changes from the delta files in directory:
+    any of people.csv, movies.csv and stars.csv, laid out like the data
+    files with an extra "op" column of "add" or "remove". Removals only
+    need the id columns.
+    """
+    for kind, (filename, columns, key_columns) in CHANGES.items():
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            op_column = header.index("op")
+            add = [header.index(column) for column in columns]
+            remove = [header.index(column) for column in key_columns]
+            for row in reader:
+                op = row[op_column]
+                if op not in ("add", "remove"):
+                    raise ValueError(f"unknown delta operation: {op}")
+                fields = add if op == "add" else remove
+                yield op, kind, tuple(row[column] for column in fields)
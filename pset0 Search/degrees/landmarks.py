@@ -0,0 +1,170 @@
+import argparse
+import os
+from array import array
+
+from graph import load_graph, map_sections, source_stamp, write_sections
+
+# Identifies landmark index files written by LandmarkIndex.save
+LANDMARKS_MAGIC = b"DEGLMRK1"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few high-degree landmark people to
+    every person in a CSRGraph.
+
+    By the triangle inequality, |d(L, u) - d(L, v)| is a lower bound on
+    the degrees of separation between u and v for every landmark L.
+    """
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Picks the count people with the most co-star links in graph as
+        landmarks and computes their distances over the whole graph.
+        """
+        n = len(graph.person_ids)
+
+        # Rank people by the total cast size of their movies
+        degree = array("i", bytes(4 * n))
+        for person in range(n):
+            for movie in graph.movies_of(person):
+                degree[person] += (graph.movie_offsets[movie + 1]
+                                   - graph.movie_offsets[movie])
+        ranked = sorted(range(n), key=degree.__getitem__, reverse=True)
+        landmarks = array("i", ranked[:count])
+
+        distances = [distances_from(graph, landmark) for landmark in landmarks]
+        return cls(landmarks, distances)
+
+    @classmethod
+    def load(cls, path, stamp=None):
+        """
+        Memory-maps a landmark index saved at path.
+
+        If the file is missing or was built from a different source
+        stamp, returns None.
+        """
+        mapping = map_sections(path, LANDMARKS_MAGIC)
+        if mapping is None:
+            return None
+        header, sections, mapped = mapping
+        if stamp is not None and header["stamp"] != stamp:
+            return None
+        distances = [sections[f"distances.{i}"]
+                     for i in range(len(sections["landmarks"]))]
+        index = cls(sections["landmarks"], distances)
+        index.mapped = mapped
+        return index
+
+    def save(self, path, stamp):
+        """
+        Writes the index to path, tagged with the source stamp of the
+        graph it was built from.
+        """
+        sections = {
+            "landmarks": array("i", self.landmarks),
+        }
+        for i, distances in enumerate(self.distances):
+            sections[f"distances.{i}"] = array("B", distances)
+        write_sections(path, LANDMARKS_MAGIC, {"stamp": stamp}, sections)
+
+    def lower_bound(self, u, v):
+        """
+        Returns a lower bound on the degrees of separation between
+        people u and v in the same component.
+        """
+        bound = 0
+        for distances in self.distances:
+            du = distances[u]
+            dv = distances[v]
+            if du != UNREACHABLE and dv != UNREACHABLE:
+                bound = max(bound, abs(du - dv))
+        return bound
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of the breadth-first distance from source to every
+    person in graph, capped below UNREACHABLE, which marks people in
+    other components.
+    """
+    distances = array("B", [UNREACHABLE]) * len(graph.person_ids)
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth = min(depth + 1, UNREACHABLE - 1)
+        next_layer = []
+        for person in layer:
+            for _, neighbor in graph.neighbors(person):
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = depth
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return distances
+
+
+def load_landmarks(directory, graph, path=None):
+    """
+    Attaches the landmark index saved for the CSV files in directory
+    (default path: directory/degrees.landmarks) to graph, if it matches
+    the files' current size and modification time and the deltas applied
+    to graph.
+
+    Returns the index, or None if there is no fresh index.
+    """
+    if path is None:
+        path = os.path.join(directory, "degrees.landmarks")
+    graph.landmarks = LandmarkIndex.load(
+        path, landmark_stamp(directory, graph)
+    )
+    return graph.landmarks
+
+
+def build_landmarks(directory, graph, count=16, path=None):
+    """
+    Builds a landmark index of count landmarks for graph, loaded for the
+    CSV files in directory, saves it to path (default:
+    directory/degrees.landmarks) and attaches it to graph.
+
+    Returns the index.
+    """
+    if path is None:
+        path = os.path.join(directory, "degrees.landmarks")
+    graph.landmarks = LandmarkIndex.build(graph, count)
+    graph.landmarks.save(path, landmark_stamp(directory, graph))
+    return graph.landmarks
+
+
+def landmark_stamp(directory, graph):
+    """
+    Returns the stamp identifying the graph a landmark index is built
+    from: its source files and the number of deltas applied to it.
+    """
+    return {"sources": source_stamp(directory), "revision": graph.revision}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the landmark distance index for degrees."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks to pick")
+    args = parser.parse_args()
+
+    graph = load_graph(args.directory)
+    index = build_landmarks(args.directory, graph, args.count)
+    print(f"Saved {len(index.landmarks)} landmarks.")
+
+
+if __name__ == "__main__":
+    main()
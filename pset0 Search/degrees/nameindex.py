@@ -0,0 +1,144 @@
+import heapq
+from bisect import bisect_left
+
+
+class NameIndex():
+    """
+    Index over people's names supporting exact, prefix and approximate
+    (edit distance) lookups, all case-insensitive.
+
+    Names are kept in case-insensitive sorted order for prefix lookups by
+    binary search; a trigram index for approximate lookups is built the
+    first time one is made.
+    """
+
+    def __init__(self, names, ids, order):
+        # names[i] and ids[i] belong to person i; order lists the people
+        # sorted by lowercase name
+        self.names = names
+        self.ids = ids
+        self.order = order
+        self.trigrams = None
+
+    def _key(self, position):
+        return self.names[self.order[position]].lower()
+
+    def _candidate(self, person, distance=0):
+        return {"person_id": self.ids[person], "name": self.names[person],
+                "distance": distance}
+
+    def exact(self, name):
+        """
+        Returns candidates whose name matches name exactly.
+        """
+        return self.prefix(name, exact=True)
+
+    def prefix(self, text, limit=None, exact=False):
+        """
+        Returns candidates whose name starts with text, in name order,
+        at most limit of them if limit is given. A candidate's distance
+        is the number of characters its name adds to text.
+        """
+        text = text.lower()
+        positions = range(len(self.order))
+        start = bisect_left(positions, text, key=self._key)
+        candidates = []
+        for position in range(start, len(self.order)):
+            if limit is not None and len(candidates) >= limit:
+                break
+            key = self._key(position)
+            if not key.startswith(text) or (exact and key != text):
+                break
+            candidates.append(self._candidate(
+                self.order[position], len(key) - len(text)
+            ))
+        return candidates
+
+    def closest(self, name, limit=10, max_distance=2):
+        """
+        Returns up to limit candidates whose name is within max_distance
+        edits of name, closest first.
+        """
+        if self.trigrams is None:
+            self.trigrams = self._index_trigrams()
+        name = name.lower()
+        query = trigrams(name)
+
+        # Each edit destroys at most three trigrams, so a match within
+        # max_distance must share all but 3 * max_distance of them
+        shared = {}
+        for trigram in query:
+            for person in self.trigrams.get(trigram, ()):
+                shared[person] = shared.get(person, 0) + 1
+        needed = len(query) - 3 * max_distance
+
+        candidates = []
+        for person, count in shared.items():
+            if count < needed:
+                continue
+            other = self.names[person].lower()
+            if abs(len(other) - len(name)) > max_distance:
+                continue
+            distance = edit_distance(name, other, max_distance)
+            if distance <= max_distance:
+                candidates.append((distance, -count, other, person))
+        candidates.sort()
+        return [self._candidate(person, distance)
+                for distance, _, _, person in candidates[:limit]]
+
+    def search(self, text, limit=10, max_distance=2):
+        """
+        Returns up to limit ranked candidates for text: exact matches,
+        then prefix matches, shortest first, then approximate matches,
+        closest first.
+        """
+        candidates = self.exact(text)
+        seen = {candidate["person_id"] for candidate in candidates}
+
+        # Rank every prefix match, not just the first ones in name order
+        prefixed = heapq.nsmallest(
+            limit + len(candidates), self.prefix(text),
+            key=lambda candidate: (candidate["distance"],
+                                   candidate["name"].lower())
+        )
+        for candidate in prefixed + self.closest(text, limit, max_distance):
+            if len(candidates) >= limit:
+                break
+            if candidate["person_id"] not in seen:
+                seen.add(candidate["person_id"])
+                candidates.append(candidate)
+        return candidates[:limit]
+
+    def _index_trigrams(self):
+        index = {}
+        for person in range(len(self.names)):
+            for trigram in trigrams(self.names[person].lower()):
+                index.setdefault(trigram, []).append(person)
+        return index
+
+
+def trigrams(text):
+    """
+    Returns the set of three-character substrings of text, padded so
+    that its start and end form trigrams too.
+    """
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """
+    Returns the Levenshtein distance between strings a and b, or any
+    value above limit as soon as the distance is known to exceed it.
+    """
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
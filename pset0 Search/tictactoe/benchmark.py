@@ -0,0 +1,93 @@
+"""
+Self-play throughput benchmark for the Tic Tac Toe engines
+"""
+
+import argparse
+import json
+import random
+import time
+
+import tictactoe as ttt
+
+
+def self_play(games, size=3, engine=None, explore=0.0, seed=0):
+    """
+    Plays games of the engine against itself, making a random move
+    instead with probability explore, and returns (positions, moves):
+    every non-terminal board met and the number of engine moves made.
+    """
+    rng = random.Random(seed)
+    positions = []
+    moves = 0
+    for _ in range(games):
+        board = ttt.initial_state(size)
+        while not ttt.terminal(board):
+            positions.append(board)
+            if rng.random() < explore:
+                action = rng.choice(sorted(ttt.actions(board)))
+            else:
+                action = ttt.minimax(board, engine)
+                moves += 1
+            board = ttt.result(board, action)
+    return positions, moves
+
+
+def benchmark(games, size=3, engine=None, explore=0.0, seed=0,
+              workers=None):
+    """
+    Times self-play and then the batch labelling of every position met,
+    returning a summary dictionary for each.
+    """
+    start = time.perf_counter()
+    positions, moves = self_play(games, size, engine, explore, seed)
+    elapsed = time.perf_counter() - start
+    play = {
+        "phase": "self-play",
+        "games": games,
+        "positions": len(positions),
+        "moves": moves,
+        "seconds": elapsed,
+        "positions_per_second": len(positions) / elapsed if elapsed else None,
+    }
+
+    start = time.perf_counter()
+    labels = ttt.evaluate_positions(positions, engine, workers)
+    elapsed = time.perf_counter() - start
+    batch = {
+        "phase": "label",
+        "positions": len(labels),
+        "workers": workers,
+        "seconds": elapsed,
+        "positions_per_second": len(labels) / elapsed if elapsed else None,
+    }
+    return play, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Tic Tac Toe self-play and batch labelling."
+    )
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=3,
+                        help="board size")
+    parser.add_argument("--length", type=int, default=None,
+                        help="number in a row needed to win")
+    parser.add_argument("--engine", default=None,
+                        help="engine to play and label with")
+    parser.add_argument("--budget", type=float, default=ttt.TIME_BUDGET,
+                        help="seconds per move for the deepening engine")
+    parser.add_argument("--explore", type=float, default=0.2,
+                        help="probability of a random move in self-play")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="label positions in this many processes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ttt.configure(args.length, args.budget)
+    for summary in benchmark(args.games, args.size, args.engine,
+                             args.explore, args.seed, args.workers):
+        print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Bitboard representation of Tic Tac Toe boards
+"""
+
+from functools import lru_cache
+
+# Same player and cell markers as the list-of-lists boards of tictactoe
+X = "X"
+O = "O"
+EMPTY = None
+
+# Cell (i, j) of the board is bit 3 * i + j of each mask
+FULL = 0b111111111
+
+# The 8 symmetries of the board, each mapping cell k = 3 * i + j of a
+# transformed board to the cell of the original board it shows
+SYMMETRIES = []
+for flip in (False, True):
+    for turns in range(4):
+        symmetry = []
+        for i in range(3):
+            for j in range(3):
+                row, col = (i, 2 - j) if flip else (i, j)
+                for _ in range(turns):
+                    row, col = col, 2 - row
+                symmetry.append(3 * row + col)
+        SYMMETRIES.append(tuple(symmetry))
+
+# Masks of the 8 winning lines: rows, columns and diagonals
+LINES = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+
+def from_board(board):
+    """
+    Returns the (x, o) masks of the cells held by X and by O on a
+    list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board for the (x, o) masks.
+    """
+    return [[X if x >> (3 * i + j) & 1
+             else O if o >> (3 * i + j) & 1
+             else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def transform(x, o, symmetry):
+    """
+    Returns the (x, o) masks of the board as seen through symmetry.
+    """
+    tx = to = 0
+    for k, cell in enumerate(symmetry):
+        tx |= (x >> cell & 1) << k
+        to |= (o >> cell & 1) << k
+    return tx, to
+
+
+def encode(x, o):
+    """
+    Returns the base-3 encoding of the board, with cell k contributing
+    1 for X or 2 for O times 3 ** k.
+    """
+    key = 0
+    for k in range(8, -1, -1):
+        key = key * 3 + (x >> k & 1) + 2 * (o >> k & 1)
+    return key
+
+
+def canonical(x, o):
+    """
+    Returns (key, symmetry) for the symmetry under which the board has
+    the smallest base-3 encoding, shared by all its rotations and
+    reflections.
+    """
+    return min((encode(*transform(x, o, symmetry)), symmetry)
+               for symmetry in SYMMETRIES)
+
+
+def player(x, o):
+    """
+    Returns player who has the next turn.
+    """
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(x, o):
+    """
+    Yields the index of each empty cell, lowest first.
+    """
+    free = FULL & ~(x | o)
+    while free:
+        bit = free & -free
+        yield bit.bit_length() - 1
+        free ^= bit
+
+
+def result(x, o, cell):
+    """
+    Returns the (x, o) masks after the next player takes cell.
+    """
+    if (x | o) >> cell & 1:
+        raise Exception("Invalid move")
+    if x.bit_count() == o.bit_count():
+        return x | 1 << cell, o
+    return x, o | 1 << cell
+
+
+def has_line(mask):
+    """
+    Returns True if mask covers any winning line.
+    """
+    for line in LINES:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if has_line(x):
+        return X
+    if has_line(o):
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return (x | o) == FULL or has_line(x) or has_line(o)
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if has_line(x):
+        return 1
+    if has_line(o):
+        return -1
+    return 0
+
+
+@lru_cache(maxsize=None)
+def value(x, o):
+    """
+    Returns the minimax value of the position, solving each position
+    once.
+    """
+    if has_line(x):
+        return 1
+    if has_line(o):
+        return -1
+    if (x | o) == FULL:
+        return 0
+    values = [value(*result(x, o, cell)) for cell in actions(x, o)]
+    return max(values) if x.bit_count() == o.bit_count() else min(values)
+
+
+def best_action(x, o):
+    """
+    Returns the optimal cell index for the next player, or None if the
+    game is over.
+    """
+    if terminal(x, o):
+        return None
+    choose = max if x.bit_count() == o.bit_count() else min
+    return choose(actions(x, o), key=lambda cell: value(*result(x, o, cell)))
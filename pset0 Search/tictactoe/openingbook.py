@@ -0,0 +1,89 @@
+"""
+Perfect-play opening book for Tic Tac Toe
+"""
+
+import os
+
+import bitboard
+
+# Default location of the serialised book
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "tictactoe.book")
+
+# One byte per base-3 board encoding
+BOOK_SIZE = 3 ** 9
+
+# Byte stored for boards that are not canonical or are already over
+MISSING = 255
+
+# Book loaded by lookup, if any
+book = None
+
+
+def build_book():
+    """
+    Solves every reachable position once and returns the book as bytes:
+    for each canonical non-terminal board, the byte at its encoding
+    holds 3 * best cell + (value + 1), in the canonical orientation.
+    """
+    table = bytearray([MISSING]) * BOOK_SIZE
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        if (x, o) in seen or bitboard.terminal(x, o):
+            continue
+        seen.add((x, o))
+        key, symmetry = bitboard.canonical(x, o)
+        if table[key] == MISSING:
+            tx, to = bitboard.transform(x, o, symmetry)
+            cell = bitboard.best_action(tx, to)
+            value = bitboard.value(tx, to)
+            table[key] = 3 * cell + value + 1
+        for cell in bitboard.actions(x, o):
+            stack.append(bitboard.result(x, o, cell))
+    return bytes(table)
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Returns the book stored at path, building and saving it first if
+    there is none.
+    """
+    try:
+        with open(path, "rb") as f:
+            table = f.read()
+        if len(table) == BOOK_SIZE:
+            return table
+    except OSError:
+        pass
+
+    table = build_book()
+    try:
+        with open(path, "wb") as f:
+            f.write(table)
+    except OSError:
+        pass
+    return table
+
+
+def lookup(x, o):
+    """
+    Returns (best cell, value) for the next player on the board, or
+    None if the game is over.
+    """
+    global book
+    if book is None:
+        book = load_book()
+    key, symmetry = bitboard.canonical(x, o)
+    entry = book[key]
+    if entry == MISSING:
+        return None
+    cell, value = divmod(entry, 3)
+    return symmetry[cell], value - 1
+
+
+if __name__ == "__main__":
+    with open(BOOK_PATH, "wb") as f:
+        f.write(build_book())
+    print(f"Saved book to {BOOK_PATH}.")
@@ -4,6 +4,11 @@ import time
 
 import tictactoe as ttt
 
+# Optional board size and number in a row to win: runner.py [size] [length]
+board_size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+if len(sys.argv) > 2:
+    ttt.WIN_LENGTH = int(sys.argv[2])
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,10 +20,10 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", 180 // board_size)
 
 user = None
-board = ttt.initial_state()
+board = ttt.initial_state(board_size)
 ai_turn = False
 
 while True:
@@ -67,13 +72,13 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_size = 240 // board_size
+        tile_origin = (width / 2 - (board_size / 2 * tile_size),
+                       height / 2 - (board_size / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(board_size):
             row = []
-            for j in range(3):
+            for j in range(board_size):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -122,8 +127,8 @@ while True:
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(board_size):
+                for j in range(board_size):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
@@ -140,7 +145,7 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
+                    board = ttt.initial_state(board_size)
                     ai_turn = False
 
     pygame.display.flip()
@@ -4,20 +4,42 @@ Tic Tac Toe Player
 
 import math
 import copy
+import multiprocessing
 import random
+import time
+from functools import lru_cache
+
+import bitboard
+import openingbook
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Number of marks in a row needed to win, or None for a full line
+WIN_LENGTH = None
+
+# Seconds the depth-limited engine may spend choosing a move
+TIME_BUDGET = 1.0
+
+# Score of a won position in depth-limited search, above any heuristic
+WIN_SCORE = 10 ** 12
+
+# Bounds stored alongside values in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps each (board size, win length) to a table from canonical board
+# keys to (value, bound) pairs found by alphabeta under those rules
+transpositions = {}
+
 
-def initial_state():
+def initial_state(size=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * size for _ in range(size)]
 
 
 def player(board):
@@ -25,7 +47,7 @@ def player(board):
     Returns player who has the next turn on a board.
     """
     # Check that the board is in its initial state and bypass the rest of the code
-    if board == initial_state():
+    if board == initial_state(len(board)):
         return X
 
     count_x = 0
@@ -58,8 +80,8 @@ def actions(board):
     moves = set()
 
     # Go through the board and gather the empty spots into moves
-    for i in range(3):
-        for j in range(3):
+    for i in range(len(board)):
+        for j in range(len(board)):
             if board[i][j] == EMPTY:
                 # Add the tuple (i, j) to the moves list
                 moves.add((i, j))
@@ -77,7 +99,8 @@ def result(board, action):
         raise ValueError("Game Over")
 
     # If action is not a valid action, raise exception
-    if action[0] not in range(0, 3) or action[1] not in range(0, 3) or board[action[0]][action[1]] is not EMPTY:
+    size = len(board)
+    if action[0] not in range(0, size) or action[1] not in range(0, size) or board[action[0]][action[1]] is not EMPTY:
         raise Exception("Invalid move")
 
     # Use copy() to make a new deep copy of the board
@@ -93,26 +116,40 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    # For X and O
-    for players in (X, O):
-        # Check state of horizontals
-        for row in range(3):
-            if all(board[row][col] == players for col in range(3)):
-                return players
+    # Check every horizontal, vertical and diagonal run of winning length
+    for line in lines(len(board), win_length(board)):
+        i, j = line[0]
+        players = board[i][j]
+        if players is not EMPTY and all(board[i][j] == players
+                                        for i, j in line):
+            return players
 
-        # Check state of verticals
-        for col in range(3):
-            if all(board[row][col] == players for row in range(3)):
-                return players
+    return None
 
-        # Check state of diagonals
-        if all(board[i][i] == players for i in range(len(board))):
-            return players
 
-        if all(board[i][len(board) - i - 1] == players for i in range(len(board))):
-            return players
+def win_length(board):
+    """
+    Returns the number of marks in a row that wins on the board.
+    """
+    return WIN_LENGTH or len(board)
 
-    return None
+
+@lru_cache(maxsize=None)
+def lines(size, length):
+    """
+    Returns every run of length cells (i, j) in a row, column or
+    diagonal of a size by size board.
+    """
+    runs = []
+    for i in range(size):
+        for j in range(size):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i = i + di * (length - 1)
+                end_j = j + dj * (length - 1)
+                if 0 <= end_i < size and 0 <= end_j < size:
+                    runs.append(tuple((i + di * k, j + dj * k)
+                                      for k in range(length)))
+    return runs
 
 
 def terminal(board):
@@ -135,22 +172,47 @@ def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
+    won = winner(board)
+    if won == X:
         return 1
-    elif winner(board) == O:
+    elif won == O:
         return -1
     else:
         return 0
 
 
-def minimax(board):
+def minimax(board, engine=None):
     """
     Returns the optimal action for the current player on the board.
+
+    The engine selects the search: "book" to look the board up in the
+    precomputed opening book, "alphabeta" for alpha-beta pruning with a
+    transposition table, "bitboard" for a memoized search over
+    bitboards, "minimax" for a full-tree search, or "deepening" for a
+    depth-limited search within TIME_BUDGET seconds. By default, 3x3
+    three-in-a-row boards use the book and larger games use deepening.
     """
     # Check that the board is not terminal before looking for optimal action
     if terminal(board):
         return None
 
+    classic = len(board) == 3 and win_length(board) == 3
+    if engine is None:
+        engine = "book" if classic else "deepening"
+    if engine in ("book", "bitboard") and not classic:
+        raise ValueError(f"{engine} engine only plays 3x3 three-in-a-row")
+
+    if engine == "deepening":
+        return deepening_action(board)
+    elif engine == "book":
+        return divmod(openingbook.lookup(*bitboard.from_board(board))[0], 3)
+    elif engine == "alphabeta":
+        return alphabeta_action(board)
+    elif engine == "bitboard":
+        return divmod(bitboard.best_action(*bitboard.from_board(board)), 3)
+    elif engine != "minimax":
+        raise ValueError(f"unknown engine: {engine}")
+
     #if board == initial_state():
     #    return random.randint(0, 2), random.randint(0, 2)
 
@@ -195,3 +257,466 @@ def min_m(board):
         val = min(val, max_m(result(board, action)))
 
     return val
+
+
+class Position:
+    """
+    A board held as (x, o) cell masks that search plays moves on and
+    takes them back with make and unmake, keeping the side to move and
+    the number of marks up to date as it goes.
+    """
+
+    def __init__(self, board):
+        size = len(board)
+        length = win_length(board)
+        self.size = size
+        self.length = length
+        self.x, self.o = masks(board)
+        self.marks = bin(self.x | self.o).count("1")
+        self.turn = X if bin(self.x).count("1") == bin(self.o).count("1") else O
+        self.runs = run_masks(size, length)
+        self.runs_through = runs_by_cell(size, length)
+        self.order = centre_order(size)
+        self.won = self.find_winner()
+
+    def find_winner(self):
+        """
+        Returns the player holding a complete run, if any.
+        """
+        for run in self.runs:
+            if self.x & run == run:
+                return X
+            if self.o & run == run:
+                return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if the game is over.
+        """
+        return self.won is not None or self.marks == self.size * self.size
+
+    def utility(self):
+        """
+        Returns 1 if X has won, -1 if O has won, 0 otherwise.
+        """
+        if self.won == X:
+            return 1
+        elif self.won == O:
+            return -1
+        return 0
+
+    def moves(self, first=None):
+        """
+        Returns the empty cells, first (if given) followed by the rest
+        from the centre of the board outwards.
+        """
+        taken = self.x | self.o
+        moves = [action for bit, action in self.order if not taken >> bit & 1]
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def make(self, action):
+        """
+        Places the mark of the side to move at action.
+        """
+        i, j = action
+        bit = 1 << (i * self.size + j)
+        turn = self.turn
+        if turn == X:
+            self.x |= bit
+            marks = self.x
+            self.turn = O
+        else:
+            self.o |= bit
+            marks = self.o
+            self.turn = X
+        self.marks += 1
+
+        # Only runs through the new mark can have been completed
+        for run in self.runs_through[i * self.size + j]:
+            if marks & run == run:
+                self.won = turn
+                break
+
+    def unmake(self, action):
+        """
+        Takes back the mark at action, which must be the last one made.
+        """
+        i, j = action
+        bit = 1 << (i * self.size + j)
+        if self.turn == O:
+            self.x &= ~bit
+            self.turn = X
+        else:
+            self.o &= ~bit
+            self.turn = O
+        self.marks -= 1
+        self.won = None
+
+    def key(self):
+        """
+        Returns the transposition key of the position within the table
+        for its board size and win length: for 3x3 boards the smallest
+        base-3 encoding among their rotations and reflections, otherwise
+        the cell masks.
+        """
+        if self.size == 3:
+            return bitboard.canonical(self.x, self.o)[0]
+        return self.x, self.o
+
+    def evaluate(self):
+        """
+        Returns a heuristic score of the position for X: every winning
+        run still open to only one player counts 10 ** (marks - 1) in
+        their favour.
+        """
+        score = 0
+        x, o = self.x, self.o
+        for run in self.runs:
+            held_x = x & run
+            held_o = o & run
+            if held_x and not held_o:
+                score += 10 ** (bin(held_x).count("1") - 1)
+            elif held_o and not held_x:
+                score -= 10 ** (bin(held_o).count("1") - 1)
+        return score
+
+
+def masks(board):
+    """
+    Returns the (x, o) masks of the cells held by X and by O, with cell
+    (i, j) at bit i * size + j.
+    """
+    size = len(board)
+    x = o = 0
+    for i in range(size):
+        for j in range(size):
+            if board[i][j] == X:
+                x |= 1 << (i * size + j)
+            elif board[i][j] == O:
+                o |= 1 << (i * size + j)
+    return x, o
+
+
+@lru_cache(maxsize=None)
+def run_masks(size, length):
+    """
+    Returns the cell mask of every winning run on the board.
+    """
+    return tuple(sum(1 << (i * size + j) for i, j in line)
+                 for line in lines(size, length))
+
+
+@lru_cache(maxsize=None)
+def runs_by_cell(size, length):
+    """
+    Returns, for every cell index, the masks of the runs through it.
+    """
+    return tuple(tuple(run for run in run_masks(size, length) if run >> cell & 1)
+                 for cell in range(size * size))
+
+
+@lru_cache(maxsize=None)
+def centre_order(size):
+    """
+    Returns (bit, action) for every cell from the centre outwards.
+    """
+    centre = (size - 1) / 2
+    cells = sorted(((i, j) for i in range(size) for j in range(size)),
+                   key=lambda action: (max(abs(action[0] - centre),
+                                           abs(action[1] - centre)), action))
+    return tuple((i * size + j, (i, j)) for i, j in cells)
+
+
+@lru_cache(maxsize=None)
+def symmetries(size):
+    """
+    Returns the eight rotations and reflections of a size by size board,
+    each as the tuple of the cell index i * size + j that every cell of
+    the transformed board is taken from.
+    """
+    found = []
+    for flip in (False, True):
+        for turns in range(4):
+            symmetry = []
+            for i in range(size):
+                for j in range(size):
+                    row, col = (i, size - 1 - j) if flip else (i, j)
+                    for _ in range(turns):
+                        row, col = col, size - 1 - row
+                    symmetry.append(size * row + col)
+            found.append(tuple(symmetry))
+    return tuple(found)
+
+
+def canonical_form(board):
+    """
+    Returns (key, symmetry) for the rotation or reflection of the board
+    with the smallest cells, read row by row with EMPTY < X < O. The key
+    is shared by every orientation of the same position.
+    """
+    marks = {EMPTY: 0, X: 1, O: 2}
+    cells = [marks[cell] for row in board for cell in row]
+    return min((tuple(cells[cell] for cell in symmetry), symmetry)
+               for symmetry in symmetries(len(board)))
+
+
+def alphabeta_action(board):
+    """
+    Returns the optimal action for the current player on the board
+    using alpha-beta search.
+    """
+    position = Position(board)
+    turn = position.turn
+    optimal_action = None
+    alpha, beta = -math.inf, math.inf
+    for action in actions(board):
+        position.make(action)
+        value = search(position, alpha, beta)
+        position.unmake(action)
+
+        # X raises the lower bound, O lowers the upper bound
+        if turn == X and value > alpha:
+            alpha = value
+            optimal_action = action
+        elif turn == O and value < beta:
+            beta = value
+            optimal_action = action
+    return optimal_action
+
+
+def alphabeta(board, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the minimax value of the board if it lies between alpha and
+    beta, or otherwise a bound beyond the window, caching results by
+    canonical board in the transposition table for the board's size
+    and win length.
+    """
+    return search(Position(board), alpha, beta)
+
+
+def search(position, alpha, beta):
+    """
+    Returns the alpha-beta value of the position as alphabeta does,
+    making and unmaking moves on it rather than copying boards.
+    """
+    table = transpositions.setdefault((position.size, position.length), {})
+    key = position.key()
+    if key in table:
+        value, bound = table[key]
+        if bound == EXACT:
+            return value
+        elif bound == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    if position.terminal():
+        value = position.utility()
+        table[key] = (value, EXACT)
+        return value
+
+    window = (alpha, beta)
+    if position.turn == X:
+        value = -math.inf
+        for action in position.moves():
+            position.make(action)
+            value = max(value, search(position, alpha, beta))
+            position.unmake(action)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        value = math.inf
+        for action in position.moves():
+            position.make(action)
+            value = min(value, search(position, alpha, beta))
+            position.unmake(action)
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+    # Record whether the value is exact or only a bound outside the window
+    if value <= window[0]:
+        table[key] = (value, UPPER)
+    elif value >= window[1]:
+        table[key] = (value, LOWER)
+    else:
+        table[key] = (value, EXACT)
+    return value
+
+
+class SearchTimeout(Exception):
+    """
+    Raised when a depth-limited search runs past its deadline.
+    """
+
+
+def deepening_action(board, budget=None, max_depth=None):
+    """
+    Returns the best action for the current player found by iterative
+    deepening: depth-limited alpha-beta searches of growing depth, each
+    trying the previous best move first, until budget seconds (default
+    TIME_BUDGET) run out, max_depth is reached or the outcome is forced.
+    """
+    return deepening_search(board, budget, max_depth)[1]
+
+
+def deepening_search(board, budget=None, max_depth=None):
+    """
+    Returns (score, action) from the deepest search deepening_action
+    completed, with the score for the current player.
+    """
+    deadline = time.monotonic() + (TIME_BUDGET if budget is None else budget)
+    empty = sum(row.count(EMPTY) for row in board)
+    if max_depth is None or max_depth > empty:
+        max_depth = empty
+
+    score, best = 0, Position(board).moves()[0]
+    for depth in range(1, max_depth + 1):
+        try:
+            score, best = search_root(board, depth, deadline, best)
+        except SearchTimeout:
+            break
+
+        # Stop once a forced win or loss is within the horizon
+        if abs(score) >= WIN_SCORE - empty:
+            break
+    return score, best
+
+
+def search_root(board, depth, deadline, first):
+    """
+    Returns (score, action) for the best action found by a search of
+    the given depth, trying first before the other actions.
+    """
+    position = Position(board)
+    alpha, beta = -math.inf, math.inf
+    best = first
+    for action in position.moves(first):
+        position.make(action)
+        score = -negamax(position, depth - 1, -beta, -alpha, deadline, 1)
+        position.unmake(action)
+        if score > alpha:
+            alpha = score
+            best = action
+    return alpha, best
+
+
+def negamax(position, depth, alpha, beta, deadline, ply):
+    """
+    Returns the score of the position for the player to move, searching
+    depth moves ahead and evaluating the leaves heuristically.
+    """
+    if time.monotonic() > deadline:
+        raise SearchTimeout
+
+    # The player who just moved has won; prefer wins found sooner
+    if position.won is not None:
+        return -(WIN_SCORE - ply)
+    if position.marks == position.size * position.size:
+        return 0
+    if depth == 0:
+        return position.evaluate() * (1 if position.turn == X else -1)
+
+    value = -math.inf
+    for action in position.moves():
+        position.make(action)
+        score = -negamax(position, depth - 1, -beta, -alpha, deadline, ply + 1)
+        position.unmake(action)
+        value = max(value, score)
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+    return value
+
+
+def label(board, engine=None):
+    """
+    Returns (value, action) for the board: its value for X (1, 0 or -1)
+    and the best action for the current player, or None if the game is
+    over. Engines are as for minimax; the deepening engine can only
+    report a win or loss it proved within its horizon, and 0 otherwise.
+    """
+    if terminal(board):
+        return utility(board), None
+
+    classic = len(board) == 3 and win_length(board) == 3
+    if engine is None:
+        engine = "book" if classic else "deepening"
+
+    if engine == "deepening":
+        score, action = deepening_search(board)
+        empty = sum(row.count(EMPTY) for row in board)
+        if abs(score) < WIN_SCORE - empty:
+            return 0, action
+        won = 1 if score > 0 else -1
+        return (won if player(board) == X else -won), action
+    elif engine == "book" and classic:
+        cell, value = openingbook.lookup(*bitboard.from_board(board))
+        return value, divmod(cell, 3)
+    action = minimax(board, engine)
+    if classic:
+        return bitboard.value(*bitboard.from_board(board)), action
+    return alphabeta(board), action
+
+
+def evaluate_positions(boards, engine=None, workers=None):
+    """
+    Returns a list of (value, action) pairs as label gives them, one for
+    each of the boards.
+
+    Each position is solved once, grouped with its rotations and
+    reflections. If workers is given, the distinct positions are shared
+    out over that many worker processes.
+    """
+    # Group the boards by position, solving each in one orientation
+    groups = {}
+    positions = []
+    for index, board in enumerate(boards):
+        size = len(board)
+        if size == 3:
+            key, symmetry = bitboard.canonical(*bitboard.from_board(board))
+        else:
+            key, symmetry = canonical_form(board)
+        if key not in groups:
+            groups[key] = []
+            cells = [cell for row in board for cell in row]
+            positions.append([[cells[cell] for cell in symmetry[i:i + size]]
+                              for i in range(0, size * size, size)])
+        groups[key].append((index, symmetry))
+
+    tasks = [(position, engine) for position in positions]
+    if workers:
+        with multiprocessing.Pool(workers, initializer=configure,
+                                  initargs=(WIN_LENGTH, TIME_BUDGET)) as pool:
+            labels = pool.starmap(label, tasks,
+                                  chunksize=max(1, len(tasks) // (4 * workers)))
+    else:
+        labels = [label(*task) for task in tasks]
+
+    # Turn each solved action back into the orientation of every board
+    results = [None] * len(boards)
+    for group, (value, action) in zip(groups.values(), labels):
+        for index, symmetry in group:
+            if action is None:
+                results[index] = (value, action)
+            else:
+                size = len(boards[index])
+                cell = symmetry[size * action[0] + action[1]]
+                results[index] = (value, divmod(cell, size))
+    return results
+
+
+def configure(win_length=None, time_budget=1.0):
+    """
+    Sets the game rules and search budget in a worker process.
+    """
+    global WIN_LENGTH, TIME_BUDGET
+    WIN_LENGTH = win_length
+    TIME_BUDGET = time_budget
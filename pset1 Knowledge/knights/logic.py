@@ -1,8 +1,14 @@
+import heapq
 import itertools
+import weakref
 
 
 class Sentence():
 
+    # Advanced by And.add, the only way to change a sentence in place,
+    # expiring the hashes, symbol sets and evaluators sentences cache
+    epoch = 0
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +19,65 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.summary()[1])
+
+    def parts(self):
+        """Returns the sentences the logical sentence is built from."""
+        return ()
+
+    def summary(self):
+        """
+        Returns the hash and the frozen set of symbols of the sentence,
+        computed from those of its parts once per epoch.
+        """
+        cached = self.__dict__.get("cached")
+        if cached is None or cached[0] != Sentence.epoch:
+            parts = self.parts()
+            cached = self.cached = (
+                Sentence.epoch,
+                hash((type(self).__name__,
+                      *(part.summary()[0] for part in parts))),
+                frozenset().union(*(part.summary()[1] for part in parts)),
+            )
+        return cached[1], cached[2]
+
+    def __getstate__(self):
+        """
+        Returns the attributes to pickle, leaving out the hash, symbols,
+        intern key and evaluator cached in this process.
+        """
+        state = self.__dict__.copy()
+        state.pop("cached", None)
+        state.pop("interned", None)
+        state.pop("evaluator", None)
+        return state
+
+    def code(self, compiler):
+        """Returns a Python expression evaluating the sentence."""
+        raise Exception("nothing to compile")
+
+    def table(self, columns, full):
+        """
+        Returns the sentence's column of a truth table as a bitmask,
+        given the column of each symbol in columns and a mask full with
+        a bit for every row.
+        """
+        raise Exception("nothing to evaluate")
+
+    def compile(self, symbols):
+        """
+        Returns a function evaluating the sentence in a model given as a
+        sequence of truth values, one for each name in symbols, in order.
+        Functions are kept until a sentence is changed in place.
+        """
+        symbols = tuple(symbols)
+        cached = self.__dict__.get("evaluator")
+        if cached is None or cached[0] != Sentence.epoch:
+            cached = self.evaluator = (Sentence.epoch, {})
+        functions = cached[1]
+        if symbols not in functions:
+            functions[symbols] = Compiler(symbols).function(self)
+        return functions[symbols]
 
     @classmethod
     def validate(cls, sentence):
@@ -51,7 +115,7 @@ class Symbol(Sentence):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self.summary()[0]
 
     def __repr__(self):
         return self.name
@@ -62,12 +126,31 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def table(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
     def formula(self):
         return self.name
 
     def symbols(self):
         return {self.name}
 
+    def summary(self):
+        cached = self.__dict__.get("cached")
+        if cached is None:
+            cached = self.cached = (hash(("symbol", self.name)),
+                                    frozenset([self.name]))
+        return cached
+
+    def code(self, compiler):
+        try:
+            return f"m[{compiler.index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -78,7 +161,7 @@ class Not(Sentence):
         return isinstance(other, Not) and self.operand == other.operand
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self.summary()[0]
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +172,27 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def parts(self):
+        return (self.operand,)
+
+    def code(self, compiler):
+        return f"(not {compiler.expression(self.operand)})"
+
+    def table(self, columns, full):
+        return full ^ self.operand.table(columns, full)
 
 
 class And(Sentence):
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = tuple(conjuncts)
 
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        return self.summary()[0]
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,7 +202,13 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        self.conjuncts += (conjunct,)
+        Sentence.epoch += 1
+
+        # An interned conjunction no longer matches its key
+        key = self.__dict__.get("interned")
+        if key is not None and interned.get(key) is self:
+            del interned[key]
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +219,35 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def parts(self):
+        return self.conjuncts
+
+    def code(self, compiler):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(compiler.expression(conjunct)
+                                  for conjunct in self.conjuncts) + ")"
+
+    def table(self, columns, full):
+        rows = full
+        for conjunct in self.conjuncts:
+            rows &= conjunct.table(columns, full)
+            if not rows:
+                break
+        return rows
 
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = tuple(disjuncts)
 
     def __eq__(self, other):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return self.summary()[0]
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,8 +262,22 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def parts(self):
+        return self.disjuncts
+
+    def code(self, compiler):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(compiler.expression(disjunct)
+                                 for disjunct in self.disjuncts) + ")"
+
+    def table(self, columns, full):
+        rows = 0
+        for disjunct in self.disjuncts:
+            rows |= disjunct.table(columns, full)
+            if rows == full:
+                break
+        return rows
 
 
 class Implication(Sentence):
@@ -174,7 +293,7 @@ class Implication(Sentence):
                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self.summary()[0]
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,8 +307,17 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def parts(self):
+        return (self.antecedent, self.consequent)
+
+    def code(self, compiler):
+        antecedent = compiler.expression(self.antecedent)
+        consequent = compiler.expression(self.consequent)
+        return f"(not {antecedent} or {consequent})"
+
+    def table(self, columns, full):
+        return ((full ^ self.antecedent.table(columns, full))
+                | self.consequent.table(columns, full))
 
 
 class Biconditional(Sentence):
@@ -205,7 +333,7 @@ class Biconditional(Sentence):
                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self.summary()[0]
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,12 +349,131 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def parts(self):
+        return (self.left, self.right)
+
+    def code(self, compiler):
+        # Each side is evaluated once and compared
+        left = compiler.expression(self.left)
+        right = compiler.expression(self.right)
+        return f"({left} == {right})"
+
+    def table(self, columns, full):
+        return full ^ (self.left.table(columns, full)
+                       ^ self.right.table(columns, full))
+
+
+class Compiler():
+    """
+    Compiles sentences into Python functions of one argument m, a sequence
+    of truth values indexed by the position of each symbol in symbols.
+    """
+
+    # Nesting depth at which a subexpression is computed up front
+    DEPTH = 30
+
+    def __init__(self, symbols):
+        self.index = {name: i for i, name in enumerate(symbols)}
+        self.lines = []
+        self.depth = 0
+        self.uses = {}
+        self.names = {}
+
+    def count(self, sentence):
+        """Counts how often each compound subsentence is evaluated."""
+        if isinstance(sentence, Symbol):
+            return
+        self.uses[sentence] = self.uses.get(sentence, 0) + 1
+        if self.uses[sentence] == 1:
+            for part in sentence.parts():
+                self.count(part)
+
+    def expression(self, sentence):
+        """Returns an expression evaluating sentence."""
+        if sentence in self.names:
+            return self.names[sentence]
+        self.depth += 1
+        try:
+            code = sentence.code(self)
+        finally:
+            self.depth -= 1
+
+        # Compute repeated subsentences once, except a symbol's negation
+        shared = (self.uses.get(sentence, 0) > 1
+                  and not (isinstance(sentence, Not)
+                           and isinstance(sentence.operand, Symbol)))
+
+        # Keep deep trees within the parser's nesting limit
+        if shared or (self.depth and self.depth % Compiler.DEPTH == 0):
+            name = f"t{len(self.lines)}"
+            self.lines.append(f"    {name} = {code}")
+            code = name
+            if shared:
+                self.names[sentence] = name
+        return code
+
+    def function(self, sentence):
+        """Returns a function of m evaluating sentence."""
+        self.count(sentence)
+        body = self.expression(sentence)
+        source = "\n".join(["def evaluate(m):", *self.lines,
+                             f"    return {body}"])
+        namespace = {}
+        exec(source, namespace)
+        return namespace["evaluate"]
+
+
+# Interned sentences, by type and the identities of their parts
+interned = weakref.WeakValueDictionary()
+
+
+def intern(sentence, memo=None):
+    """
+    Returns a sentence equal to sentence in which equal subsentences
+    are one shared object, also shared with every other interned
+    sentence. Interned sentences share parts, so changing one in place
+    with And.add changes every sentence built on it.
+    """
+    if isinstance(sentence, Symbol):
+        key = ("symbol", sentence.name)
+    else:
+        if memo is None:
+            memo = {}
+        if id(sentence) in memo:
+            return memo[id(sentence)]
+        parts = [intern(part, memo) for part in sentence.parts()]
+        key = (type(sentence), *map(id, parts))
+
+    shared = interned.get(key)
+    if shared is None:
+        shared = (sentence if isinstance(sentence, Symbol)
+                  else type(sentence)(*parts))
+        shared.interned = key
+        interned[key] = shared
+    if memo is not None:
+        memo[id(sentence)] = shared
+    return shared
+
+
+def model_check(knowledge, query, method="enumerate"):
+    """
+    Checks if knowledge base entails query, by enumerating every model
+    with both sentences compiled ("enumerate"), by enumerating models
+    of the sentence trees ("recursive"), by evaluating whole truth
+    tables at once with bitwise operations ("table"), or by asking a
+    SAT solver ("sat"). A KnowledgeBase as knowledge answers the query
+    itself, from its cache where it can.
+    """
+    if isinstance(knowledge, KnowledgeBase):
+        return knowledge.entails(query)
+    if method == "sat":
+        return sat_check(knowledge, query)
+    elif method == "enumerate":
+        return compiled_check(knowledge, query)
+    elif method == "table":
+        return table_check(knowledge, query)
+    elif method != "recursive":
+        raise ValueError(f"unknown method: {method}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +508,441 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def compiled_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by trying every model on
+    both sentences compiled over one list of truth values.
+    """
+    # Number the symbols once and compile both sentences over them
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    knowledge = knowledge.compile(symbols)
+    query = query.compile(symbols)
+
+    # Query must hold in every model where knowledge holds
+    for model in itertools.product((True, False), repeat=len(symbols)):
+        if knowledge(model) and not query(model):
+            return False
+    return True
+
+
+# Truth table rows evaluated at once by table_check, as a power of two
+TABLE_BITS = 20
+
+
+def table_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating both sentences
+    over blocks of up to 2 ** TABLE_BITS rows of the truth table at a
+    time, with each column held as the bits of one integer.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    width = min(len(symbols), TABLE_BITS)
+    full = (1 << (1 << width)) - 1
+
+    # Within a block, the first symbols alternate in runs of 2 ** i rows
+    columns = {}
+    for i, name in enumerate(symbols[:width]):
+        run = 1 << i
+        columns[name] = (((1 << run) - 1) << run) * (
+            full // ((1 << (2 * run)) - 1)
+        )
+
+    # The remaining symbols are constant within each block
+    for block in range(1 << (len(symbols) - width)):
+        for i, name in enumerate(symbols[width:]):
+            columns[name] = full if block >> i & 1 else 0
+        rows = knowledge.table(columns, full)
+        if rows and rows & ~query.table(columns, full):
+            return False
+    return True
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by showing that knowledge
+    together with the negation of query is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    negation = -cnf.literal(query)
+    return not Solver(cnf.clauses).solve([negation])
+
+
+class CNF():
+    """
+    Tseitin encoding of sentences into clauses in conjunctive normal
+    form: lists of non-zero integers, where variable v stands for v and
+    -v for its negation. Every symbol gets a variable, and so does every
+    compound subsentence, defined by clauses to be equivalent to it.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.literals = {}
+        self.count = 0
+
+    def new_variable(self):
+        """Returns a fresh variable."""
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable of the symbol called name."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Adds clauses asserting that sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, defining it if needed."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(part) for part in sentence.conjuncts]
+            v = self.new_variable()
+
+            # v implies every conjunct, and all of them together imply v
+            self.clauses.extend([-v, part] for part in parts)
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(part) for part in sentence.disjuncts]
+            v = self.new_variable()
+
+            # Every disjunct implies v, and v implies one of them
+            self.clauses.extend([v, -part] for part in parts)
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = v
+        return v
+
+
+class Solver():
+    """
+    CDCL satisfiability solver: unit propagation over two watched
+    literals per clause, first-UIP clause learning with backjumping,
+    and activity-ordered decisions with phase saving.
+    """
+
+    def __init__(self, clauses=()):
+        self.ok = True
+        self.assigns = [0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+        self.watches = {}
+        self.trail = []
+        self.trail_lim = []
+        self.head = 0
+        self.order = []
+        self.increment = 1.0
+        self.model = None
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def ensure(self, v):
+        """Makes room for variables up to v."""
+        while len(self.assigns) <= v:
+            n = len(self.assigns)
+            self.assigns.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.polarity.append(False)
+            self.watches[n] = []
+            self.watches[-n] = []
+            heapq.heappush(self.order, (0.0, n))
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.assigns[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, clause):
+        """
+        Adds a clause between searches, returning False if the clauses
+        have become unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.ensure(max((abs(literal) for literal in clause), default=0))
+
+        # Drop false and repeated literals, and clauses already satisfied
+        literals = []
+        for literal in clause:
+            value = self.value(literal)
+            if value > 0 or -literal in literals:
+                return True
+            if value == 0 and literal not in literals:
+                literals.append(literal)
+
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watch(literals)
+        return self.ok
+
+    def watch(self, clause):
+        """Watches the first two literals of clause."""
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        """Makes literal true, implied by reason or else decided."""
+        v = abs(literal)
+        self.assigns[v] = 1 if literal > 0 else -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses, returning a
+        conflicting clause if one becomes false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches[false]
+            self.watches[false] = kept = []
+            for index, clause in enumerate(watchers):
+                # Keep the false literal in the second position
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if self.value(first) > 0:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) >= 0:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(first) < 0:
+                        kept.extend(watchers[index + 1:])
+                        self.head = len(self.trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learned from a conflict, with its
+        asserting literal first, and the level to backjump to.
+        """
+        seen = set()
+        learned = [None]
+        current = len(self.trail_lim)
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for q in (clause if literal is None else clause[1:]):
+                v = abs(q)
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.level[v] == current:
+                        pending += 1
+                    else:
+                        learned.append(q)
+
+            # Resolve on the latest assignment involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(literal)]
+            pending -= 1
+            if pending == 0:
+                break
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        deepest = max(range(1, len(learned)),
+                      key=lambda k: self.level[abs(learned[k])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def bump(self, v):
+        """Raises the activity of variable v."""
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-a, n) for n, a in enumerate(self.activity) if n]
+            heapq.heapify(self.order)
+        heapq.heappush(self.order, (-self.activity[v], v))
+
+    def cancel(self, level):
+        """Undoes every assignment above level."""
+        if len(self.trail_lim) <= level:
+            return
+        for literal in self.trail[self.trail_lim[level]:]:
+            v = abs(literal)
+            self.polarity[v] = literal > 0
+            self.assigns[v] = 0
+            self.reason[v] = None
+            heapq.heappush(self.order, (-self.activity[v], v))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the most active unassigned variable, or None."""
+        while self.order:
+            activity, v = heapq.heappop(self.order)
+            if self.assigns[v] == 0 and -activity == self.activity[v]:
+                return v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses can be satisfied with every literal
+        in assumptions true, saving a satisfying assignment as model, a
+        dictionary from variable to bool.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.ensure(abs(literal))
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.cancel(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= 0.95
+                continue
+
+            # Decide the assumptions first, each at its own level
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                if self.value(literal) < 0:
+                    self.cancel(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if self.value(literal) == 0:
+                    self.assign(literal, None)
+                continue
+
+            v = self.decide()
+            if v is None:
+                self.model = {n: self.assigns[n] > 0
+                              for n in range(1, len(self.assigns))}
+                self.cancel(0)
+                return True
+            self.trail_lim.append(len(self.trail))
+            self.assign(v if self.polarity[v] else -v, None)
+
+
+class KnowledgeBase():
+    """
+    Knowledge that grows one sentence at a time and answers repeated
+    entailment queries. Its sentences are kept encoded in one solver,
+    whose learned clauses carry over from query to query, and answers
+    are cached: entailed queries stay entailed as knowledge grows, and
+    models that refuted earlier queries are kept while they still
+    satisfy the knowledge, to refute later queries without solving.
+    """
+
+    def __init__(self, *sentences):
+        self.knowledge = And()
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.encoded = 0
+        self.answers = {}
+        self.models = []
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds sentence to the knowledge."""
+        Sentence.validate(sentence)
+        self.knowledge.add(sentence)
+        self.cnf.add(sentence)
+        self.encode()
+
+        # Only answers that were not entailed can change
+        self.answers = {query: entailed
+                        for query, entailed in self.answers.items()
+                        if entailed}
+        symbols = sentence.symbols()
+        self.models = [model for model in self.models
+                       if symbols <= model.keys() and sentence.evaluate(model)]
+
+    def encode(self):
+        """Passes clauses the solver has not seen on to it."""
+        for clause in self.cnf.clauses[self.encoded:]:
+            self.solver.add_clause(clause)
+        self.encoded = len(self.cnf.clauses)
+
+    def entails(self, query):
+        """Checks if the knowledge entails query."""
+        if query in self.answers:
+            return self.answers[query]
+
+        # A known model of the knowledge may already refute the query
+        symbols = query.symbols()
+        for model in self.models:
+            if symbols <= model.keys() and not query.evaluate(model):
+                self.answers[query] = False
+                return False
+
+        # Otherwise look for a model of the knowledge where query is false
+        literal = self.cnf.literal(query)
+        self.encode()
+        entailed = not self.solver.solve([-literal])
+        if not entailed:
+            model = self.solver.model
+            self.models.append({name: model[v]
+                                for name, v in self.cnf.variables.items()})
+        self.answers[query] = entailed
+        return entailed